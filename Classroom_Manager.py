@@ -1,97 +1,1466 @@
+import heapq
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import List, Optional
+from functools import lru_cache
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
-@dataclass
+# -------------------------
+# Time model
+# -------------------------
+# Reservations hold integer microseconds since 1970-01-01 UTC, so overlap
+# tests are plain integer comparisons and bookings that cross a clock
+# change can't silently overlap. Datetimes only appear at the edges: naive
+# ones are wall-clock times in the scheduler's time zone, aware ones are
+# converted.
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+@lru_cache(maxsize=4096)
+def _wall_offset(minute: datetime, fold: int, tz: Optional[tzinfo]) -> Optional[int]:
+    """UTC offset in microseconds of a wall-clock minute, or None if the
+    clocks skip it. Bookings sit on a coarse grid, so this is cached."""
+    minute = minute.replace(fold=fold)
+    aware = minute.replace(tzinfo=tz) if tz is not None else minute.astimezone()
+    if aware.astimezone(timezone.utc).astimezone(tz).replace(tzinfo=None) != minute:
+        return None
+    return aware.utcoffset() // _MICROSECOND
+
+
+def to_epoch(value: datetime, tz: Optional[tzinfo] = None, strict: bool = True) -> int:
+    """Microseconds since the epoch for ``value``.
+
+    Naive values are read as wall-clock time in ``tz`` (the system's local
+    time when None); in the hour repeated when clocks go back, ``fold``
+    picks which one. With ``strict``, wall-clock times skipped when clocks
+    go forward raise ValueError.
+    """
+    if value.tzinfo is not None:
+        return (value - _EPOCH) // _MICROSECOND
+    offset = _wall_offset(value.replace(second=0, microsecond=0), value.fold, tz)
+    if offset is None:
+        if strict:
+            raise ValueError(f"{value} does not exist in the local time zone (clock change).")
+        aware = value.replace(tzinfo=tz) if tz is not None else value.astimezone()
+        return (aware - _EPOCH) // _MICROSECOND
+    return (value - _NAIVE_EPOCH) // _MICROSECOND - offset
+
+
+def from_epoch(value: int, tz: Optional[tzinfo] = timezone.utc) -> datetime:
+    """Aware datetime for epoch microseconds, in ``tz`` (local time when None)."""
+    return (_EPOCH + timedelta(microseconds=value)).astimezone(tz)
+
+
+def wall_time(value: int, tz: Optional[tzinfo] = None) -> datetime:
+    """Naive wall-clock datetime for epoch microseconds in ``tz`` (local
+    time when None); ``fold`` marks the second pass of a repeated hour."""
+    return from_epoch(value, tz).replace(tzinfo=None)
+
+
+@dataclass(slots=True)
 class Classroom:
     id: str
     capacity: int
     location: Optional[str] = None
     is_under_maintenance: bool = False
-    maintenance_notes: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class Reservation:
+    """A single booking of ``[start_us, end_us)`` in epoch microseconds.
+
+    ``start`` and ``end`` are naive wall-clock times in ``tz``, like the
+    datetimes given to the Scheduler; it sets ``tz`` to its own time zone
+    on every booking it hands out (None is the system's local time).
+    """
+    id: int
+    classroom_id: str
+    reserved_by: str
+    start_us: int
+    end_us: int
+    tz: Optional[tzinfo] = field(default=None, repr=False, compare=False)
+
+    @property
+    def start(self) -> datetime:
+        return wall_time(self.start_us, self.tz)
+
+    @property
+    def end(self) -> datetime:
+        return wall_time(self.end_us, self.tz)
+
+@dataclass(slots=True)
+class MaintenanceTicket:
+    """A maintenance report on one classroom.
+
+    Without a window the room is out of service from the moment the ticket
+    is opened until it is resolved. With ``start_us``/``end_us`` it only
+    blocks bookings inside that range. Times are epoch microseconds.
+    """
+    id: int
+    classroom_id: str
+    description: str
+    reported_us: int
+    start_us: Optional[int] = None
+    end_us: Optional[int] = None
+    resolved_us: Optional[int] = None
+
+    @property
+    def status(self) -> str:
+        return "open" if self.resolved_us is None else "resolved"
+
+    @property
+    def scheduled(self) -> bool:
+        return self.start_us is not None
+
+@dataclass(slots=True)
+class EquipmentBooking:
+    """Use of one equipment item over ``[start_us, end_us)``, optionally as
+    part of the room reservation ``reservation_id``. ``start`` and ``end``
+    read like Reservation's."""
+    id: int
+    equipment_id: str
+    reserved_by: str
+    start_us: int
+    end_us: int
+    reservation_id: Optional[int] = None
+    tz: Optional[tzinfo] = field(default=None, repr=False, compare=False)
+
+    @property
+    def start(self) -> datetime:
+        return wall_time(self.start_us, self.tz)
+
+    @property
+    def end(self) -> datetime:
+        return wall_time(self.end_us, self.tz)
+
+@dataclass(slots=True)
+class RecurringReservation:
+    """A booking repeated daily or weekly, stored as one record.
+
+    The first occurrence is ``[start, end)``; later ones are shifted by whole
+    periods up to and including the ``until`` day. Occurrences starting on a
+    day in ``exceptions`` are skipped. Occurrences are computed on demand and
+    never stored.
+
+    ``start`` and ``end`` are naive wall-clock times in the scheduler's time
+    zone, so a 9:00 lecture stays at 9:00 when the clocks change.
+    """
     id: int
     classroom_id: str
     reserved_by: str
     start: datetime
     end: datetime
+    frequency: str
+    until: date
+    exceptions: Set[date] = field(default_factory=set)
+
+    PERIOD_DAYS = {"daily": 1, "weekly": 7}
+
+    def __post_init__(self):
+        if self.frequency not in self.PERIOD_DAYS:
+            raise ValueError(f"Unknown frequency {self.frequency!r}; use 'daily' or 'weekly'.")
+        if self.end - self.start > self.period:
+            raise ValueError("A recurring booking can't last longer than its period.")
+
+    @property
+    def period(self) -> timedelta:
+        return timedelta(days=self.PERIOD_DAYS[self.frequency])
+
+    @property
+    def count(self) -> int:
+        """Number of occurrences, skipped ones included."""
+        return max(0, (self.until - self.start.date()).days // self.PERIOD_DAYS[self.frequency] + 1)
+
+    @property
+    def last_end(self) -> datetime:
+        return self.end + (self.count - 1) * self.period
+
+    def occurrences(self, lo: datetime, hi: datetime) -> Iterator[Tuple[datetime, datetime]]:
+        """Yield the ``(start, end)`` of each occurrence overlapping ``[lo, hi)``."""
+        period = self.period
+        duration = self.end - self.start
+        # Occurrence k overlaps iff start + k*period < hi and end + k*period > lo.
+        first = max(0, (lo - self.end) // period + 1)
+        last = min(self.count - 1, -((self.start - hi) // period) - 1)
+        for k in range(first, last + 1):
+            start = self.start + k * period
+            if start.date() not in self.exceptions:
+                yield start, start + duration
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        return next(self.occurrences(start, end), None) is not None
+
+    def conflicts_with(self, other: "RecurringReservation") -> bool:
+        lo, hi = max(self.start, other.start), min(self.last_end, other.last_end)
+        if lo >= hi:
+            return False
+        if self.period == other.period:
+            # Same period: the two series keep a fixed offset, so if their
+            # slots don't intersect within one period they never will.
+            offset = (other.start - self.start) % self.period
+            if offset >= self.end - self.start and offset + (other.end - other.start) <= self.period:
+                return False
+        # Walk the sparser series through the shared window only.
+        sparse, dense = (self, other) if self.period >= other.period else (other, self)
+        return any(dense.overlaps(s, e) for s, e in sparse.occurrences(lo, hi))
+
+@dataclass(slots=True)
+class BookingResult:
+    """Outcome of one request passed to ``Scheduler.reserve_many``."""
+    index: int
+    classroom_id: str
+    start: datetime
+    end: datetime
+    reserved_by: str
+    reservation: Optional[Reservation] = None
+    reason: Optional[str] = None
+
+    @property
+    def accepted(self) -> bool:
+        return self.reservation is not None
+
+@dataclass(slots=True)
+class FreeSlot:
+    """A window in which ``classroom`` has no bookings (aware datetimes)."""
+    classroom: Classroom
+    start: datetime
+    end: datetime
+
+class ReservationColumns:
+    """Reservations of one room stored column-wise, in start order.
+
+    Ids and start/end times (epoch microseconds) live in int64
+    arrays and ``reserved_by`` names are interned, so a booking costs a few
+    dozen bytes instead of a Reservation object and two datetimes.
+    Reservation objects are only built when rows are read back.
+    """
+    __slots__ = ("classroom_id", "ids", "starts", "ends", "reserved_by")
+
+    def __init__(self, classroom_id: str, reservations: Iterable[Reservation] = ()):
+        self.classroom_id = classroom_id
+        self.ids = array("q")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.reserved_by: List[str] = []
+        self.extend(reservations)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> Reservation:
+        return Reservation(self.ids[i], self.classroom_id, self.reserved_by[i],
+                           self.starts[i], self.ends[i])
+
+    def __iter__(self) -> Iterator[Reservation]:
+        return (self[i] for i in range(len(self.ids)))
+
+    def extend(self, reservations: Iterable[Reservation]):
+        """Append reservations that start no earlier than the last stored one."""
+        for res in reservations:
+            if self.starts and res.start_us < self.starts[-1]:
+                raise ValueError("Reservations must be appended in start order.")
+            self.ids.append(res.id)
+            self.starts.append(res.start_us)
+            self.ends.append(res.end_us)
+            self.reserved_by.append(sys.intern(res.reserved_by))
+
+    def find_overlap(self, start: int, end: int) -> Optional[Reservation]:
+        i = bisect_left(self.starts, end)
+        if i and self.ends[i - 1] > start:
+            return self[i - 1]
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns (interned names are shared and not counted)."""
+        return sum(col.buffer_info()[1] * col.itemsize for col in (self.ids, self.starts, self.ends)) \
+            + sys.getsizeof(self.reserved_by)
+
+
+class _RoomIndex:
+    """Reservations and scheduled maintenance windows of a single classroom,
+    kept sorted by start time.
+
+    Entries in one room never overlap, so the entry with the latest start
+    before ``end`` is the only one that can collide with a query, whether
+    it is a booking or a maintenance window. The same structure holds the
+    EquipmentBookings of one equipment item.
+    """
 
-class Scheduler:
     def __init__(self):
+        self.starts: List[int] = []
+        self.items: List[Union[Reservation, MaintenanceTicket]] = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, res: Reservation):
+        i = bisect_right(self.starts, res.start_us)
+        self.starts.insert(i, res.start_us)
+        self.items.insert(i, res)
+
+    def extend(self, reservations: List[Reservation]):
+        """Merge a start-ordered run of reservations into the index."""
+        if not reservations:
+            return
+        # Only the entries starting within the run's span need merging; the
+        # rest stay in place and the merged slice is spliced back in.
+        lo = bisect_left(self.starts, reservations[0].start_us)
+        hi = bisect_right(self.starts, reservations[-1].start_us, lo=lo)
+        merged = list(heapq.merge(self.items[lo:hi], reservations, key=lambda r: r.start_us))
+        self.items[lo:hi] = merged
+        self.starts[lo:hi] = [r.start_us for r in merged]
+
+    def pop_ended(self, cutoff: int) -> List[Reservation]:
+        """Remove and return the reservations that ended at or before ``cutoff``."""
+        # Non-overlapping bookings sorted by start are sorted by end as well.
+        i = bisect_right(self.items, cutoff, key=lambda r: r.end_us)
+        ended = self.items[:i]
+        del self.items[:i]
+        del self.starts[:i]
+        return ended
+
+    def discard(self, res: Reservation) -> bool:
+        i = bisect_left(self.starts, res.start_us)
+        while i < len(self.items) and self.starts[i] == res.start_us:
+            if self.items[i] is res:
+                del self.starts[i]
+                del self.items[i]
+                return True
+            i += 1
+        return False
+
+    def find_overlap(self, start: int, end: int) -> Optional[Union[Reservation, MaintenanceTicket]]:
+        i = bisect_left(self.starts, end)
+        if i and self.items[i - 1].end_us > start:
+            return self.items[i - 1]
+        return None
+
+    def overlapping(self, start: int, end: int) -> List[Union[Reservation, MaintenanceTicket]]:
+        """Every entry meeting ``[start, end)``, in start order."""
+        # Sorted by start means sorted by end too, so walk back from the
+        # last entry starting before ``end`` until one ends by ``start``.
+        i = j = bisect_left(self.starts, end)
+        while j and self.items[j - 1].end_us > start:
+            j -= 1
+        return self.items[j:i]
+
+    def reservations(self) -> List[Reservation]:
+        return [item for item in self.items if isinstance(item, Reservation)]
+
+    def free_intervals(self, lo: int, hi: int,
+                       extra: Iterable[Tuple[int, int]] = ()) -> Iterator[Tuple[int, int]]:
+        """Yield the gaps between bookings that fall inside ``[lo, hi)``.
+
+        ``extra`` holds further busy ``(start, end)`` pairs in start order,
+        such as occurrences of recurring bookings.
+        """
+        i = bisect_left(self.starts, lo)
+        if i and self.items[i - 1].end_us > lo:
+            i -= 1
+        busy = ((self.items[j].start_us, self.items[j].end_us) for j in range(i, len(self.items)))
+        cursor = lo
+        for start, end in heapq.merge(busy, extra):
+            if start >= hi:
+                break
+            if start > cursor:
+                yield cursor, start
+            cursor = max(cursor, end)
+        if cursor < hi:
+            yield cursor, hi
+
+class Scheduler:
+    def __init__(self, store=None, retention: timedelta = timedelta(0), tz: Optional[tzinfo] = None,
+                 assets=None):
+        """``store`` is an optional persistence backend (see scheduler_store.py).
+
+        ``assets`` is an optional equipment_management.AssetRegistry whose
+        items can be booked over time, alone or together with a room.
+
+        ``tz`` is the time zone naive datetimes are read in and results are
+        returned in; the system's local time when None.
+
+        Classrooms are read from the store up front; each room's reservations
+        are only loaded the first time that room is booked or searched.
+        Scheduled maintenance windows share the room's conflict index with
+        its reservations, so one lookup answers both.
+
+        ``compact()`` moves reservations that ended more than ``retention``
+        ago out of the conflict indexes into a compact history, so the
+        working set only holds current and future bookings.
+
+        The scheduler is thread-safe. Each classroom has its own lock, so
+        bookings for different rooms proceed in parallel while bookings for
+        the same room are serialised.
+        """
         self.classrooms: List[Classroom] = []
-        self.reservations: List[Reservation] = []
+        self._by_id: Dict[int, Reservation] = {}
+        # Recurring bookings are few (one per course section), so they are
+        # kept for every room and looked up by id or by room.
+        self._series: Dict[int, RecurringReservation] = {}
+        self._room_series: Dict[str, List[RecurringReservation]] = {}
         self._next_reservation_id = 1
+        self.retention = retention
+        self.tz = tz
+        # Archived reservations, column-wise per room, and archived series.
+        # With a store the database already keeps the history, so archived
+        # reservations are simply dropped from memory.
+        self._archive: Dict[str, ReservationColumns] = {}
+        self._archived_series: Dict[int, RecurringReservation] = {}
+        self._archived_until: Optional[int] = None
+        self._rooms: Dict[str, Classroom] = {}
+        self._room_index: Dict[str, _RoomIndex] = {}
+        self._room_locks: Dict[str, threading.Lock] = {}
+        self._by_capacity: List[Tuple[int, str]] = []
+        self._by_location: Dict[Optional[str], List[str]] = {}
+        self._store = store
+        self._listeners: List[Callable[[str, str, object], None]] = []
+        # Open maintenance tickets by id and by room, and the rooms that are
+        # out of service right now. Resolved tickets go to the store, or to
+        # _resolved_tickets when there is none.
+        self._tickets: Dict[int, MaintenanceTicket] = {}
+        self._room_tickets: Dict[str, Dict[int, MaintenanceTicket]] = {}
+        self._blocked: Set[str] = set()
+        self._resolved_tickets: List[MaintenanceTicket] = []
+        self._next_ticket_id = 1
+        # Equipment bookings, indexed per item like reservations per room
+        # and loaded lazily the same way, and by id and by the room
+        # reservation they belong to.
+        self.assets = assets
+        self._equipment_index: Dict[str, _RoomIndex] = {}
+        self._equipment_locks: Dict[str, threading.Lock] = {}
+        self._equipment_bookings: Dict[int, EquipmentBooking] = {}
+        self._linked: Dict[int, List[EquipmentBooking]] = {}
+
+        self._rooms_lock = threading.Lock()   # room registration
+        self._id_lock = threading.Lock()      # reservation id allocation
+        self._load_lock = threading.Lock()    # lazy loading of room indexes
+
+        if store is not None:
+            for room in store.load_classrooms():
+                self._register_room(room)
+            for series in store.load_recurring():
+                self._series[series.id] = series
+                self._room_series[series.classroom_id].append(series)
+            for ticket in store.load_tickets(status="open"):
+                self._track_ticket(ticket)
+            self._next_reservation_id = store.next_reservation_id()
+            self._next_ticket_id = store.next_ticket_id()
+
+    @property
+    def reservations(self) -> List[Reservation]:
+        """Active (not yet archived) reservations of every room."""
+        # Every room has to be loaded to hand out the full list.
+        for room_id in list(self._rooms):
+            self._index_for(room_id)
+        return list(self._by_id.copy().values())
+
+    def reservation_count(self) -> int:
+        """Number of reservations ever kept, archived ones included."""
+        if self._store is not None:
+            return self._store.count_reservations()
+        return len(self._by_id) + sum(len(columns) for columns in self._archive.values())
+
+    def flush(self):
+        """Write any batched changes through to the store."""
+        if self._store is not None:
+            self._store.flush()
+
+    def subscribe(self, listener: Callable[[str, str, object], None]):
+        """Call ``listener(event, classroom_id, detail)`` after every change.
+
+        Events are ``"booked"`` and ``"released"`` with a list of
+        ``(start_us, end_us)`` spans, which also cover scheduled maintenance
+        windows as they are placed and resolved, ``"maintenance"`` with the
+        room's new flag and ``"classroom"`` with a newly added Classroom.
+        Listeners run under the room's lock and should return quickly.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[str, str, object], None]):
+        self._listeners.remove(listener)
 
     # -------------------------
     # CLASSROOM MANAGEMENT
     # -------------------------
     def add_classroom(self, room: Classroom):
-        self.classrooms.append(room)
+        with self._rooms_lock:
+            if room.id in self._rooms:
+                raise ValueError(f"Classroom {room.id} already exists")
+            self._room_index[room.id] = _RoomIndex()
+            self._register_room(room)
+        if self._store is not None:
+            self._store.save_classroom(room)
+        self._notify("classroom", room.id, room)
 
-    def report_maintenance(self, classroom_id: str, description: str):
-        room = self._find_room(classroom_id)
-        room.is_under_maintenance = True
-        room.maintenance_notes.append(description)
+    def get_classroom(self, classroom_id: str) -> Optional[Classroom]:
+        return self._rooms.get(classroom_id)
+
+    def classroom_ids(self) -> List[str]:
+        return list(self._rooms)
+
+    # -------------------------
+    # MAINTENANCE
+    # -------------------------
+    def open_ticket(self, classroom_id: str, description: str,
+                    start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    bump: bool = False) -> MaintenanceTicket:
+        """Open a maintenance ticket; pass ``start``/``end`` to schedule a window.
+
+        A window is refused if it meets bookings of the room, unless
+        ``bump`` is set: then those bookings are cancelled and occurrences
+        of recurring bookings inside the window are skipped.
+        """
+        self._find_room(classroom_id)
+        if (start is None) != (end is None):
+            raise ValueError("A maintenance window needs both a start and an end.")
+        if start is None:
+            with self._room_locks[classroom_id]:
+                ticket = MaintenanceTicket(self._allocate_ticket_ids(1), classroom_id, description,
+                                           to_epoch(datetime.now(timezone.utc)))
+                if self._store is not None:
+                    self._store.save_tickets([ticket])
+                self._track_ticket(ticket)
+            return ticket
+        tickets, errors = self.close_rooms(start, end, description, classroom_ids=[classroom_id], bump=bump)
+        if errors:
+            raise ValueError(errors[classroom_id])
+        return tickets[0]
+
+    def close_rooms(self, start: datetime, end: datetime, description: str,
+                    location: Optional[str] = None, classroom_ids: Optional[Iterable[str]] = None,
+                    bump: bool = False) -> Tuple[List[MaintenanceTicket], Dict[str, str]]:
+        """Schedule one maintenance window over many rooms at once.
+
+        The rooms are ``classroom_ids``, or every room at ``location``. All of
+        them are locked together and the tickets are written in a single
+        store call. Returns the tickets opened and, per room, why a window
+        couldn't be placed (see open_ticket() for ``bump``).
+        """
+        start_us, end_us = self._window(start, end)
+        if classroom_ids is None:
+            if location is None:
+                raise ValueError("Give a location or the classroom ids to close.")
+            classroom_ids = self._by_location.get(location, [])
+        room_ids = sorted(set(classroom_ids))
+        for room_id in room_ids:
+            self._find_room(room_id)
+        indexes = {room_id: self._index_for(room_id) for room_id in room_ids}
+
+        tickets: List[MaintenanceTicket] = []
+        errors: Dict[str, str] = {}
+        with ExitStack() as locks:
+            # Same lock order as reserve_many() so the two can't deadlock.
+            for room_id in room_ids:
+                locks.enter_context(self._room_locks[room_id])
+            placeable = []
+            for room_id in room_ids:
+                reason = self._clear_window(room_id, indexes[room_id], start_us, end_us, bump)
+                if reason is None:
+                    placeable.append(room_id)
+                else:
+                    errors[room_id] = reason
+            reported = to_epoch(datetime.now(timezone.utc))
+            next_id = self._allocate_ticket_ids(len(placeable))
+            for ticket_id, room_id in enumerate(placeable, next_id):
+                ticket = MaintenanceTicket(ticket_id, room_id, description, reported, start_us, end_us)
+                indexes[room_id].add(ticket)
+                self._track_ticket(ticket)
+                tickets.append(ticket)
+            if self._store is not None and tickets:
+                self._store.save_tickets(tickets)
+            # A window occupies the room like a booking does.
+            for ticket in tickets:
+                self._notify("booked", ticket.classroom_id, [(start_us, end_us)])
+        return tickets, errors
+
+    def report_maintenance(self, classroom_id: str, description: str,
+                           start: Optional[datetime] = None, end: Optional[datetime] = None):
+        ticket = self.open_ticket(classroom_id, description, start, end)
+        if ticket.scheduled:
+            return (f"Maintenance ticket {ticket.id} scheduled for {classroom_id} "
+                    f"{self._local(ticket.start_us):%Y-%m-%d %H:%M} to "
+                    f"{self._local(ticket.end_us):%Y-%m-%d %H:%M}: {description}")
         return f"Maintenance reported for {classroom_id}: {description}"
 
+    def resolve_ticket(self, ticket_id: int):
+        """Close one ticket; a scheduled window stops blocking bookings."""
+        ticket = self._tickets.get(ticket_id)
+        if ticket is None:
+            raise ValueError(f"Maintenance ticket {ticket_id} not found")
+        with self._room_locks[ticket.classroom_id]:
+            # Another resolve, resolve_maintenance() or compact() may have
+            # closed it while this call waited for the lock.
+            if ticket.id not in self._tickets:
+                raise ValueError(f"Maintenance ticket {ticket_id} not found")
+            self._close_tickets([ticket])
+            if ticket.scheduled:
+                self._notify("released", ticket.classroom_id, [(ticket.start_us, ticket.end_us)])
+        return f"Maintenance ticket {ticket_id} resolved"
+
     def resolve_maintenance(self, classroom_id: str):
-        room = self._find_room(classroom_id)
-        room.is_under_maintenance = False
+        """Put a room back in service by resolving its unscheduled tickets."""
+        self._find_room(classroom_id)
+        with self._room_locks[classroom_id]:
+            open_tickets = self._room_tickets.get(classroom_id, {}).values()
+            self._close_tickets([ticket for ticket in open_tickets if not ticket.scheduled])
+            # Rooms added as under maintenance have no ticket to resolve.
+            self._set_blocked(classroom_id, False)
         return f"Maintenance resolved for {classroom_id}"
 
+    def get_tickets(self, classroom_id: Optional[str] = None, status: str = "open") -> List[MaintenanceTicket]:
+        """Tickets with ``status`` "open", "resolved" or "all", oldest first."""
+        if classroom_id is not None:
+            self._find_room(classroom_id)
+        if status not in ("open", "resolved", "all"):
+            raise ValueError(f"Unknown ticket status {status!r}")
+        if status == "open":
+            tickets = self._room_tickets.get(classroom_id, {}) if classroom_id else self._tickets
+            return sorted(tickets.copy().values(), key=lambda t: t.id)
+        if self._store is not None:
+            return self._store.load_tickets(classroom_id, status)
+        found = [t for t in self._resolved_tickets if classroom_id in (None, t.classroom_id)]
+        if status == "all":
+            found += self.get_tickets(classroom_id)
+        return sorted(found, key=lambda t: t.id)
+
     def get_maintenance_reports(self, classroom_id: Optional[str] = None):
+        """Descriptions of open tickets for a room, or for every room that has any."""
         if classroom_id:
-            room = self._find_room(classroom_id)
-            return room.maintenance_notes
-        # all rooms
-        return {r.id: r.maintenance_notes for r in self.classrooms}
+            self._find_room(classroom_id)
+            return [t.description for t in self.get_tickets(classroom_id)]
+        return {room_id: [t.description for t in sorted(tickets.copy().values(), key=lambda t: t.id)]
+                for room_id, tickets in self._room_tickets.copy().items()}
+
+    def blocked_rooms(self) -> Set[str]:
+        """Rooms out of service right now (unscheduled open tickets)."""
+        return set(self._blocked)
+
+    def maintenance_count(self) -> int:
+        return len(self._blocked)
 
     # -------------------------
     # RESERVATION SYSTEM
     # -------------------------
     def reserve_classroom(self, classroom_id: str, start: datetime, end: datetime, reserved_by: str):
         room = self._find_room(classroom_id)
+        start_us, end_us = self._window(start, end)
+        self._check_not_archived(start_us)
+        index = self._index_for(classroom_id)
 
-        if room.is_under_maintenance:
-            return f"Classroom {classroom_id} is unavailable (maintenance)."
+        # Check and insert under the room's lock so two threads can't both
+        # see the slot as free.
+        with self._room_locks[classroom_id]:
+            reason = self._room_conflict(room, index, start_us, end_us)
+            if reason is not None:
+                return reason
+
+            res = Reservation(
+                id=self._allocate_ids(1),
+                classroom_id=classroom_id,
+                reserved_by=reserved_by,
+                start_us=start_us,
+                end_us=end_us,
+                tz=self.tz
+            )
+
+            self._by_id[res.id] = res
+            index.add(res)
+            if self._store is not None:
+                self._store.add_reservations([res])
+            self._notify("booked", classroom_id, [(start_us, end_us)])
+
+        return f"Reservation {res.id} created for classroom {classroom_id}"
+
+    def reserve_many(self, requests: Iterable[Tuple[str, datetime, datetime, str]],
+                     atomic: bool = False) -> List[BookingResult]:
+        """Book many ``(classroom_id, start, end, reserved_by)`` requests at once.
+
+        Requests are grouped by room and swept in start order against both the
+        existing bookings and the batch itself; when two requests collide the
+        earlier-starting one wins. Results come back in input order. With
+        ``atomic=True`` nothing is committed unless every request is accepted.
+        """
+        results = [BookingResult(i, *req) for i, req in enumerate(requests)]
+
+        by_room: Dict[str, List[BookingResult]] = {}
+        spans: Dict[int, Tuple[int, int]] = {}
+        for item in results:
+            if item.classroom_id not in self._rooms:
+                item.reason = f"Classroom {item.classroom_id} not found"
+                continue
+            try:
+                spans[item.index] = self._window(item.start, item.end)
+                self._check_not_archived(spans[item.index][0])
+            except ValueError as exc:
+                item.reason = str(exc)
+                continue
+            by_room.setdefault(item.classroom_id, []).append(item)
+
+        indexes = {classroom_id: self._index_for(classroom_id) for classroom_id in by_room}
+        with ExitStack() as locks:
+            # Always lock rooms in the same order so concurrent batches can't deadlock.
+            for classroom_id in sorted(by_room):
+                locks.enter_context(self._room_locks[classroom_id])
+
+            accepted: Dict[str, List[BookingResult]] = {}
+            for classroom_id, items in by_room.items():
+                if self._rooms[classroom_id].is_under_maintenance:
+                    for item in items:
+                        item.reason = f"Classroom {classroom_id} is unavailable (maintenance)."
+                    continue
+                items.sort(key=lambda it: spans[it.index])
+                existing = indexes[classroom_id].items
+                j = 0
+                last_end = None
+                for item in items:
+                    start_us, end_us = spans[item.index]
+                    # Existing entries are sorted by end as well as by start:
+                    # jump to the first one still running at ``start_us``.
+                    j = bisect_right(existing, start_us, lo=j, key=lambda r: r.end_us)
+                    clash = existing[j] if j < len(existing) and existing[j].start_us < end_us else None
+                    if isinstance(clash, MaintenanceTicket):
+                        item.reason = f"Classroom {classroom_id} is unavailable (maintenance)."
+                        continue
+                    if clash or (last_end is not None and start_us < last_end) or \
+                            self._series_overlap(classroom_id, start_us, end_us):
+                        item.reason = f"Classroom {classroom_id} is already reserved in this time slot."
+                        continue
+                    last_end = end_us
+                    accepted.setdefault(classroom_id, []).append(item)
+
+            if atomic and any(item.reason for item in results):
+                for items in accepted.values():
+                    for item in items:
+                        item.reason = "Batch aborted: another request in the batch was rejected."
+                return results
 
-        # Check reservation conflicts
-        for r in self.reservations:
-            if r.classroom_id == classroom_id and not (end <= r.start or start >= r.end):
+            next_id = self._allocate_ids(sum(len(items) for items in accepted.values()))
+            new_by_room: Dict[str, List[Reservation]] = {}
+            committed: List[Reservation] = []
+            for item in results:
+                if item.reason is not None:
+                    continue
+                item.reservation = Reservation(
+                    id=next_id,
+                    classroom_id=item.classroom_id,
+                    reserved_by=item.reserved_by,
+                    start_us=spans[item.index][0],
+                    end_us=spans[item.index][1],
+                    tz=self.tz
+                )
+                next_id += 1
+                committed.append(item.reservation)
+                new_by_room.setdefault(item.classroom_id, []).append(item.reservation)
+
+            self._by_id.update((res.id, res) for res in committed)
+            for classroom_id, reservations in new_by_room.items():
+                reservations.sort(key=lambda r: r.start_us)
+                indexes[classroom_id].extend(reservations)
+                self._notify("booked", classroom_id, [(r.start_us, r.end_us) for r in reservations])
+            if self._store is not None:
+                self._store.add_reservations(committed)
+                self._store.flush()
+
+        return results
+
+    def reserve_recurring(self, classroom_id: str, start: datetime, end: datetime, reserved_by: str,
+                          until: date, frequency: str = "weekly", exceptions: Iterable[date] = ()):
+        """Book ``[start, end)`` every day or week up to and including ``until``.
+
+        The series is stored as a single record; conflicts are checked by
+        expanding occurrences only where they meet other bookings.
+        """
+        room = self._find_room(classroom_id)
+        self._check_not_archived(self._window(start, end)[0])
+        series = RecurringReservation(0, classroom_id, reserved_by, self._wall(start), self._wall(end),
+                                      frequency, until, set(exceptions))
+        if series.count == 0:
+            raise ValueError("The series ends before its first occurrence.")
+        index = self._index_for(classroom_id)
+
+        with self._room_locks[classroom_id]:
+            if room.is_under_maintenance:
+                return f"Classroom {classroom_id} is unavailable (maintenance)."
+            # Only occurrences inside the span of existing bookings and
+            # maintenance windows can clash.
+            if index.items:
+                lo, hi = index.items[0].start_us, index.items[-1].end_us
+                for s, e in self._occurrences(series, lo, hi):
+                    clash = index.find_overlap(s, e)
+                    if isinstance(clash, MaintenanceTicket):
+                        return f"Classroom {classroom_id} is unavailable (maintenance)."
+                    if clash:
+                        return f"Classroom {classroom_id} is already reserved in this time slot."
+            if any(series.conflicts_with(other) for other in self._room_series[classroom_id]):
                 return f"Classroom {classroom_id} is already reserved in this time slot."
 
-        res = Reservation(
-            id=self._next_reservation_id,
-            classroom_id=classroom_id,
-            reserved_by=reserved_by,
-            start=start,
-            end=end
-        )
+            series.id = self._allocate_ids(1)
+            self._series[series.id] = series
+            self._room_series[classroom_id].append(series)
+            if self._store is not None:
+                self._store.save_recurring(series)
+            self._notify("booked", classroom_id, list(self._all_occurrences(series)))
 
-        self.reservations.append(res)
-        self._next_reservation_id += 1
+        return f"Recurring reservation {series.id} created for classroom {classroom_id}"
 
-        return f"Reservation {res.id} created for classroom {classroom_id}"
+    def skip_occurrence(self, series_id: int, day: date):
+        """Cancel the single occurrence of a recurring booking on ``day``."""
+        series = self._series.get(series_id)
+        if series is None:
+            raise ValueError(f"Recurring reservation {series_id} not found")
+        with self._room_locks[series.classroom_id]:
+            before = set(self._all_occurrences(series))
+            series.exceptions.add(day)
+            if self._store is not None:
+                self._store.save_recurring(series)
+            skipped = before.difference(self._all_occurrences(series))
+            if skipped:
+                self._notify("released", series.classroom_id, sorted(skipped))
+        return f"Occurrence of reservation {series_id} on {day} cancelled"
+
+    def get_recurring(self, classroom_id: Optional[str] = None) -> List[RecurringReservation]:
+        if classroom_id is None:
+            return list(self._series.copy().values())
+        self._find_room(classroom_id)
+        with self._room_locks[classroom_id]:
+            return list(self._room_series[classroom_id])
+
+    def get_schedule(self, classroom_id: str, start: datetime, end: datetime) -> List[Reservation]:
+        """All bookings of a room overlapping ``[start, end)``, occurrences of
+        recurring bookings included, ordered by start time."""
+        self._find_room(classroom_id)
+        start_us, end_us = self._window(start, end)
+        index = self._room_index.get(classroom_id)
+        if index is None and self._store is None:
+            index = self._index_for(classroom_id)
+        with self._room_locks[classroom_id]:
+            if index is None:
+                # Read just the window rather than loading the room's whole
+                # history; the room is loaded once it is booked.
+                found = self._in_tz(self._store.load_reservations(classroom_id, since=start_us, until=end_us))
+            else:
+                found = [res for res in index.overlapping(start_us, end_us) if isinstance(res, Reservation)]
+            for series in self._room_series[classroom_id]:
+                found.extend(Reservation(series.id, classroom_id, series.reserved_by, s, e, self.tz)
+                             for s, e in self._occurrences(series, start_us, end_us))
+        return sorted(found, key=lambda r: r.start_us)
+
+    def find_free_rooms(self, start: datetime, end: datetime, capacity: int = 0,
+                        location: Optional[str] = None,
+                        duration: Optional[timedelta] = None,
+                        limit: Optional[int] = None,
+                        include_maintenance: bool = False) -> List[FreeSlot]:
+        """Find rooms with at least ``capacity`` seats that are free.
+
+        Without ``duration`` a room must be free for the whole of
+        ``[start, end)``. With ``duration``, ``[start, end)`` is the search
+        horizon and each result is the room's earliest gap of that length.
+        Rooms are returned smallest-first, stopping after ``limit`` matches.
+        Scheduled maintenance windows count as busy time; rooms that are out
+        of service are skipped unless ``include_maintenance`` is set.
+        """
+        start_us, end_us = self._window(start, end)
+        if duration is not None and duration <= timedelta(0):
+            raise ValueError("Duration must be positive.")
+
+        found: List[FreeSlot] = []
+        for _, room_id in self._by_capacity[bisect_left(self._by_capacity, (capacity, "")):]:
+            if limit is not None and len(found) >= limit:
+                break
+            room = self._rooms[room_id]
+            if location is not None and room.location != location:
+                continue
+            if room.is_under_maintenance and not include_maintenance:
+                continue
+            index = self._index_for(room_id)
+            with self._room_locks[room_id]:
+                if duration is None:
+                    if index.find_overlap(start_us, end_us) is None and \
+                            not self._series_overlap(room_id, start_us, end_us):
+                        found.append(FreeSlot(room, self._local(start_us), self._local(end_us)))
+                    continue
+                extra = heapq.merge(*(self._occurrences(series, start_us, end_us)
+                                      for series in self._room_series[room_id]))
+                for gap_start, gap_end in index.free_intervals(start_us, end_us, extra):
+                    if gap_end - gap_start >= duration // _MICROSECOND:
+                        # Add in epoch time: aware datetime arithmetic is
+                        # wall-clock and would drift across a clock change.
+                        found.append(FreeSlot(room, self._local(gap_start),
+                                              self._local(gap_start + duration // _MICROSECOND)))
+                        break
+        return found
+
+    def get_reservation(self, reservation_id: int) -> Optional[Reservation]:
+        """Look up an active reservation by id (O(1) once its room is loaded).
+        Recurring bookings are looked up with get_recurring()."""
+        res = self._by_id.get(reservation_id)
+        if res is None and self._store is not None:
+            stored = self._store.get_reservation(reservation_id)
+            if stored is not None and stored.classroom_id not in self._room_index:
+                self._index_for(stored.classroom_id)
+                res = self._by_id.get(reservation_id)
+        return res
+
+    def cancel_reservation(self, reservation_id: int):
+        series = self._series.get(reservation_id)
+        if series is not None:
+            # Cancelling a recurring booking drops the whole series.
+            with self._room_locks[series.classroom_id]:
+                if self._series.pop(reservation_id, None) is None:
+                    raise ValueError(f"Reservation {reservation_id} not found")
+                self._room_series[series.classroom_id].remove(series)
+                if self._store is not None:
+                    self._store.delete_recurring(reservation_id)
+                self._notify("released", series.classroom_id, list(self._all_occurrences(series)))
+            return f"Reservation {reservation_id} cancelled"
+
+        res = self._active_reservation(reservation_id)
+        with self._room_locks[res.classroom_id]:
+            if self._by_id.get(reservation_id) is not res:
+                raise ValueError(f"Reservation {reservation_id} not found")
+            self._drop_reservation(res)
+        return f"Reservation {reservation_id} cancelled"
+
+    def reschedule(self, reservation_id: int, new_start: datetime, new_end: datetime):
+        start_us, end_us = self._window(new_start, new_end)
+        self._check_not_archived(start_us)
+        res = self._active_reservation(reservation_id)
+        index = self._index_for(res.classroom_id)
+        with self._room_locks[res.classroom_id]:
+            if self._by_id.get(reservation_id) is not res:
+                raise ValueError(f"Reservation {reservation_id} not found")
+            # Take the booking out so it can't conflict with itself.
+            index.discard(res)
+            reason = self._room_conflict(self._rooms[res.classroom_id], index, start_us, end_us)
+            if reason is not None:
+                index.add(res)
+                return reason
+            # Equipment booked with the room moves along, or the move fails.
+            linked = self._linked_bookings(reservation_id)
+            with self._lock_equipment(b.equipment_id for b in linked):
+                for booking in linked:
+                    self._equipment_index[booking.equipment_id].discard(booking)
+                busy = [b for b in linked
+                        if self._equipment_index[b.equipment_id].find_overlap(start_us, end_us)]
+                if busy:
+                    for booking in linked:
+                        self._equipment_index[booking.equipment_id].add(booking)
+                    index.add(res)
+                    return f"Equipment {busy[0].equipment_id} is already booked in this time slot."
+                for booking in linked:
+                    booking.start_us, booking.end_us = start_us, end_us
+                    self._equipment_index[booking.equipment_id].add(booking)
+                if self._store is not None and linked:
+                    self._store.update_equipment_bookings(linked)
+            self._notify("released", res.classroom_id, [(res.start_us, res.end_us)])
+            res.start_us, res.end_us = start_us, end_us
+            index.add(res)
+            if self._store is not None:
+                self._store.update_reservation(res)
+            self._notify("booked", res.classroom_id, [(start_us, end_us)])
+        return (f"Reservation {reservation_id} moved to "
+                f"{self._local(start_us):%Y-%m-%d %H:%M}-{self._local(end_us):%H:%M}")
+
+    def compact(self, now: Optional[datetime] = None) -> int:
+        """Archive reservations that ended before ``now - retention``.
+
+        Archived reservations leave the conflict indexes for good, and
+        bookings that start before the cutoff are refused from then on.
+        Returns the number of reservations archived.
+        """
+        cutoff = self._epoch(now or datetime.now(timezone.utc)) - self.retention // _MICROSECOND
+        if self._archived_until is not None and cutoff <= self._archived_until:
+            return 0
+        self._archived_until = cutoff
+        for ticket in list(self._tickets.values()):
+            # Scheduled windows that are over resolve themselves, which also
+            # takes them out of the room indexes before those are archived.
+            # Like archived bookings they are not reported as released.
+            if ticket.scheduled and ticket.end_us <= cutoff:
+                with self._room_locks[ticket.classroom_id]:
+                    if ticket.id in self._tickets:
+                        self._close_tickets([ticket])
+        archived = 0
+        for series in list(self._series.values()):
+            if to_epoch(series.last_end, self.tz, strict=False) <= cutoff:
+                with self._room_locks[series.classroom_id]:
+                    self._series.pop(series.id, None)
+                    self._room_series[series.classroom_id].remove(series)
+                if self._store is None:
+                    self._archived_series[series.id] = series
+                archived += 1
+        for room_id, index in list(self._room_index.items()):
+            with self._room_locks[room_id]:
+                ended = index.pop_ended(cutoff)
+                for res in ended:
+                    self._by_id.pop(res.id, None)
+                if self._store is None and ended:
+                    self._archive.setdefault(room_id, ReservationColumns(room_id)).extend(ended)
+                archived += len(ended)
+        # Ended equipment bookings are simply dropped; a store keeps them.
+        for equipment_id, index in list(self._equipment_index.items()):
+            with self._equipment_locks[equipment_id]:
+                for booking in index.pop_ended(cutoff):
+                    self._untrack_equipment_booking(booking)
+        return archived
+
+    def get_history(self, classroom_id: Optional[str] = None) -> List[Reservation]:
+        """Archived reservations, oldest first (in-memory history only).
+
+        Archived recurring bookings are expanded into their occurrences.
+        """
+        found = []
+        for room_id, columns in self._archive.copy().items():
+            if classroom_id in (None, room_id):
+                found.extend(columns)
+        for series in self._archived_series.copy().values():
+            if classroom_id in (None, series.classroom_id):
+                found.extend(Reservation(series.id, series.classroom_id, series.reserved_by, s, e)
+                             for s, e in self._all_occurrences(series))
+        return sorted(self._in_tz(found), key=lambda r: r.start_us)
+
+    def get_reservations(self, classroom_id: str) -> List[Reservation]:
+        """Reservations of one classroom, ordered by start time."""
+        self._find_room(classroom_id)
+        index = self._index_for(classroom_id)
+        with self._room_locks[classroom_id]:
+            return index.reservations()
 
     def check_availability(self, classroom_id: str, start: datetime, end: datetime) -> bool:
         room = self._find_room(classroom_id)
+        start_us, end_us = self._window(start, end)
 
         if room.is_under_maintenance:
             return False
 
-        for r in self.reservations:
-            if r.classroom_id == classroom_id and not (end <= r.start or start >= r.end):
+        with self._room_locks[classroom_id]:
+            if self._series_overlap(classroom_id, start_us, end_us):
                 return False
+        if classroom_id not in self._room_index and classroom_id not in self._room_tickets \
+                and self._store is not None:
+            # Answer from the store's range index rather than loading the room;
+            # rooms with maintenance windows are loaded so they're checked too.
+            return self._store.find_overlap(classroom_id, start_us, end_us) is None
+        index = self._index_for(classroom_id)
+        with self._room_locks[classroom_id]:
+            return index.find_overlap(start_us, end_us) is None
+
+    # -------------------------
+    # EQUIPMENT BOOKINGS
+    # -------------------------
+    def reserve_equipment(self, equipment_id: str, start: datetime, end: datetime, reserved_by: str):
+        """Book one item of the asset registry over ``[start, end)``."""
+        start_us, end_us = self._window(start, end)
+        self._check_not_archived(start_us)
+        self._equipment_index_for(equipment_id)
+        with self._lock_equipment([equipment_id]):
+            reason = self._equipment_conflict(equipment_id, start_us, end_us, (reserved_by,))
+            if reason is not None:
+                return reason
+            booking = EquipmentBooking(self._allocate_ids(1), equipment_id, reserved_by, start_us, end_us,
+                                       tz=self.tz)
+            self._add_equipment_bookings([booking])
+        return f"Equipment booking {booking.id} created for {equipment_id}"
+
+    def reserve_with_equipment(self, classroom_id: str, start: datetime, end: datetime, reserved_by: str,
+                               equipment_ids: Iterable[str] = (), categories: Iterable[str] = ()):
+        """Book a room together with equipment, all or nothing.
+
+        ``equipment_ids`` are booked as given. For each entry of
+        ``categories`` one free item of that category is picked, preferring
+        items allocated to the room over unallocated ones. Items allocated
+        to anyone but the room or ``reserved_by`` are never booked.
+        """
+        room = self._find_room(classroom_id)
+        start_us, end_us = self._window(start, end)
+        self._check_not_archived(start_us)
+        index = self._index_for(classroom_id)
+        holders = (classroom_id, reserved_by)
+        picked = list(dict.fromkeys(equipment_ids))
+        for equipment_id in picked:
+            self._equipment_index_for(equipment_id)
+        for category in categories:
+            # Picked without locks, then checked again under them below.
+            found = self._pick_equipment(category, start_us, end_us, holders, picked)
+            if found is None:
+                return f"No {category} equipment is free in this time slot."
+            picked.append(found)
+
+        with self._room_locks[classroom_id], self._lock_equipment(picked):
+            reason = self._room_conflict(room, index, start_us, end_us)
+            for equipment_id in picked:
+                reason = reason or self._equipment_conflict(equipment_id, start_us, end_us, holders)
+            if reason is not None:
+                return reason
+            first_id = self._allocate_ids(1 + len(picked))
+            res = Reservation(first_id, classroom_id, reserved_by, start_us, end_us, self.tz)
+            self._by_id[res.id] = res
+            index.add(res)
+            if self._store is not None:
+                self._store.add_reservations([res])
+                self._store.flush()
+            self._add_equipment_bookings([
+                EquipmentBooking(first_id + 1 + i, equipment_id, reserved_by, start_us, end_us, res.id, self.tz)
+                for i, equipment_id in enumerate(picked)])
+            self._notify("booked", classroom_id, [(start_us, end_us)])
+
+        if not picked:
+            return f"Reservation {res.id} created for classroom {classroom_id}"
+        return f"Reservation {res.id} created for classroom {classroom_id} with {', '.join(picked)}"
+
+    def get_equipment_bookings(self, equipment_id: str) -> List[EquipmentBooking]:
+        """Active bookings of one item, ordered by start time."""
+        index = self._equipment_index_for(equipment_id)
+        with self._lock_equipment([equipment_id]):
+            return list(index.items)
+
+    def get_linked_equipment(self, reservation_id: int) -> List[EquipmentBooking]:
+        """Equipment booked together with a room reservation."""
+        return list(self._linked_bookings(reservation_id))
+
+    def cancel_equipment_booking(self, booking_id: int):
+        booking = self._equipment_bookings.get(booking_id)
+        if booking is None and self._store is not None:
+            stored = self._store.get_equipment_booking(booking_id)
+            if stored is not None:
+                self._equipment_index_for(stored.equipment_id)
+                booking = self._equipment_bookings.get(booking_id)
+        if booking is None:
+            raise ValueError(f"Equipment booking {booking_id} not found")
+        with self._lock_equipment([booking.equipment_id]):
+            if self._equipment_bookings.get(booking_id) is not booking:
+                raise ValueError(f"Equipment booking {booking_id} not found")
+            self._drop_equipment_bookings([booking])
+        return f"Equipment booking {booking_id} cancelled"
+
+    def free_equipment(self, start: datetime, end: datetime, category: Optional[str] = None) -> List[str]:
+        """Unallocated items (of ``category``) with no booking in ``[start, end)``."""
+        start_us, end_us = self._window(start, end)
+        return [eq.equipment_id for eq in self._require_assets().find(category=category, allocated=False)
+                if self._equipment_free(eq.equipment_id, start_us, end_us)]
+
+    def find_rooms_with_equipment(self, start: datetime, end: datetime, category: str,
+                                  capacity: int = 0, location: Optional[str] = None) -> Dict[str, List[str]]:
+        """Rooms free over ``[start, end)`` that hold an item of ``category``
+        which is free too, e.g. rooms with a free projector at 10:00.
+
+        Starts from the registry's category and assignee indexes, so only
+        rooms that hold such an item are looked at; returns each room's
+        free items.
+        """
+        start_us, end_us = self._window(start, end)
+        holders: Dict[str, List[str]] = {}
+        for eq in self._require_assets().find(category=category, allocated=True):
+            if eq.allocated_to in self._rooms:
+                holders.setdefault(eq.allocated_to, []).append(eq.equipment_id)
 
-        return True
+        found: Dict[str, List[str]] = {}
+        for room_id in sorted(holders):
+            room = self._rooms[room_id]
+            if room.capacity < capacity or location not in (None, room.location) or room.is_under_maintenance:
+                continue
+            free = [eid for eid in holders[room_id] if self._equipment_free(eid, start_us, end_us)]
+            if not free:
+                continue
+            index = self._index_for(room_id)
+            with self._room_locks[room_id]:
+                if self._room_conflict(room, index, start_us, end_us) is None:
+                    found[room_id] = free
+        return found
 
     # -------------------------
     # Helper
     # -------------------------
     def _find_room(self, classroom_id: str) -> Classroom:
-        room = next((r for r in self.classrooms if r.id == classroom_id), None)
-        if not room:
+        room = self._rooms.get(classroom_id)
+        if room is None:
             raise ValueError(f"Classroom {classroom_id} not found")
-        return room
\ No newline at end of file
+        return room
+
+    def _register_room(self, room: Classroom):
+        self._room_locks[room.id] = threading.Lock()
+        self._room_series[room.id] = []
+        if room.is_under_maintenance:
+            self._blocked.add(room.id)
+        self.classrooms.append(room)
+        insort(self._by_capacity, (room.capacity, room.id))
+        self._by_location.setdefault(room.location, []).append(room.id)
+        self._rooms[room.id] = room
+
+    def _index_for(self, classroom_id: str) -> _RoomIndex:
+        index = self._room_index.get(classroom_id)
+        if index is None:
+            with self._load_lock:
+                index = self._room_index.get(classroom_id)
+                if index is None:
+                    index = _RoomIndex()
+                    if self._store is not None:
+                        loaded = self._in_tz(self._store.load_reservations(classroom_id, since=self._archived_until))
+                        windows = [t for t in self._room_tickets.get(classroom_id, {}).values() if t.scheduled]
+                        index.extend(loaded)
+                        index.extend(sorted(windows, key=lambda t: t.start_us))
+                        self._by_id.update((res.id, res) for res in loaded)
+                    # Publish only once fully loaded.
+                    self._room_index[classroom_id] = index
+        return index
+
+    def _series_overlap(self, classroom_id: str, start: int, end: int) -> bool:
+        """Whether a recurring booking of the room meets ``[start, end)``.
+        Callers hold the room's lock."""
+        return any(next(self._occurrences(series, start, end), None) is not None
+                   for series in self._room_series[classroom_id])
+
+    def _occurrences(self, series: RecurringReservation, lo: int, hi: int) -> Iterator[Tuple[int, int]]:
+        """Occurrences of ``series`` overlapping epoch window ``[lo, hi)``."""
+        # The series repeats in wall-clock time: take the window in UTC wall
+        # time widened by a day to cover any offset, then check each
+        # occurrence exactly.
+        slack = timedelta(days=1)
+        wall_lo = _NAIVE_EPOCH + timedelta(microseconds=lo) - slack
+        wall_hi = _NAIVE_EPOCH + timedelta(microseconds=hi) + slack
+        for start, end in series.occurrences(wall_lo, wall_hi):
+            start_us, end_us = to_epoch(start, self.tz, strict=False), to_epoch(end, self.tz, strict=False)
+            if start_us < hi and end_us > lo:
+                yield start_us, end_us
+
+    def _track_ticket(self, ticket: MaintenanceTicket):
+        self._tickets[ticket.id] = ticket
+        self._room_tickets.setdefault(ticket.classroom_id, {})[ticket.id] = ticket
+        if not ticket.scheduled:
+            self._set_blocked(ticket.classroom_id, True)
+
+    def _close_tickets(self, tickets: List[MaintenanceTicket]):
+        """Resolve open tickets of one room. Callers hold the room's lock."""
+        now = to_epoch(datetime.now(timezone.utc))
+        for ticket in tickets:
+            ticket.resolved_us = now
+            del self._tickets[ticket.id]
+            room_tickets = self._room_tickets[ticket.classroom_id]
+            del room_tickets[ticket.id]
+            if not room_tickets:
+                del self._room_tickets[ticket.classroom_id]
+            index = self._room_index.get(ticket.classroom_id)
+            if ticket.scheduled and index is not None:
+                index.discard(ticket)
+        if self._store is not None:
+            self._store.save_tickets(tickets)
+        else:
+            self._resolved_tickets.extend(tickets)
+        for classroom_id in {ticket.classroom_id for ticket in tickets}:
+            still_open = self._room_tickets.get(classroom_id, {}).values()
+            self._set_blocked(classroom_id, any(not t.scheduled for t in still_open))
+
+    def _set_blocked(self, classroom_id: str, blocked: bool):
+        room = self._rooms[classroom_id]
+        if room.is_under_maintenance == blocked and (classroom_id in self._blocked) == blocked:
+            return
+        room.is_under_maintenance = blocked
+        if blocked:
+            self._blocked.add(classroom_id)
+        else:
+            self._blocked.discard(classroom_id)
+        if self._store is not None:
+            self._store.save_classroom(room)
+        self._notify("maintenance", classroom_id, blocked)
+
+    def _clear_window(self, classroom_id: str, index: _RoomIndex, start: int, end: int,
+                      bump: bool) -> Optional[str]:
+        """Make ``[start, end)`` free for a maintenance window, or say why it
+        can't be. Callers hold the room's lock."""
+        clashes = index.overlapping(start, end)
+        if any(isinstance(item, MaintenanceTicket) for item in clashes):
+            return f"Classroom {classroom_id} already has maintenance scheduled in this window."
+        hits = [(series, s, e) for series in self._room_series[classroom_id]
+                for s, e in self._occurrences(series, start, end)]
+        if (clashes or hits) and not bump:
+            return f"Classroom {classroom_id} has bookings in this window."
+        for res in clashes:
+            self._drop_reservation(res)
+        for series, s, e in hits:
+            series.exceptions.add(self._local(s).date())
+        if self._store is not None:
+            for series in {series.id: series for series, _, _ in hits}.values():
+                self._store.save_recurring(series)
+        if hits:
+            self._notify("released", classroom_id, [(s, e) for _, s, e in hits])
+        return None
+
+    def _drop_reservation(self, res: Reservation):
+        """Cancel an active reservation and the equipment booked with it.
+        Callers hold the room's lock."""
+        del self._by_id[res.id]
+        self._room_index[res.classroom_id].discard(res)
+        if self._store is not None:
+            self._store.delete_reservation(res.id)
+        linked = self._linked_bookings(res.id)
+        if linked:
+            with self._lock_equipment(b.equipment_id for b in linked):
+                self._drop_equipment_bookings(linked)
+        self._notify("released", res.classroom_id, [(res.start_us, res.end_us)])
+
+    def _room_conflict(self, room: Classroom, index: _RoomIndex, start: int, end: int) -> Optional[str]:
+        """Why ``room`` can't be booked over ``[start, end)``, or None.
+        Callers hold the room's lock."""
+        # A single lookup finds both bookings and maintenance windows.
+        clash = index.find_overlap(start, end)
+        if room.is_under_maintenance or isinstance(clash, MaintenanceTicket):
+            return f"Classroom {room.id} is unavailable (maintenance)."
+        if clash or self._series_overlap(room.id, start, end):
+            return f"Classroom {room.id} is already reserved in this time slot."
+        return None
+
+    def _require_assets(self):
+        if self.assets is None:
+            raise ValueError("No asset registry is attached to the scheduler.")
+        return self.assets
+
+    def _equipment_index_for(self, equipment_id: str) -> _RoomIndex:
+        self._require_assets().get(equipment_id)
+        index = self._equipment_index.get(equipment_id)
+        if index is None:
+            with self._load_lock:
+                index = self._equipment_index.get(equipment_id)
+                if index is None:
+                    index = _RoomIndex()
+                    if self._store is not None:
+                        loaded = self._in_tz(self._store.load_equipment_bookings(equipment_id, since=self._archived_until))
+                        index.extend(loaded)
+                        for booking in loaded:
+                            self._track_equipment_booking(booking)
+                    self._equipment_locks[equipment_id] = threading.Lock()
+                    # Publish only once fully loaded.
+                    self._equipment_index[equipment_id] = index
+        return index
+
+    @contextmanager
+    def _lock_equipment(self, equipment_ids: Iterable[str]):
+        """Lock items in id order; room locks are always taken first."""
+        with ExitStack() as locks:
+            for equipment_id in sorted(set(equipment_ids)):
+                locks.enter_context(self._equipment_locks[equipment_id])
+            yield
+
+    def _equipment_conflict(self, equipment_id: str, start: int, end: int,
+                            holders: Tuple[str, ...]) -> Optional[str]:
+        """Why an item can't be booked over ``[start, end)`` by one of
+        ``holders``, or None. Callers hold the item's lock."""
+        equipment = self.assets.get(equipment_id)
+        if equipment.is_allocated and equipment.allocated_to not in holders:
+            return f"Equipment {equipment_id} is allocated to {equipment.allocated_to}."
+        if self._equipment_index[equipment_id].find_overlap(start, end):
+            return f"Equipment {equipment_id} is already booked in this time slot."
+        return None
+
+    def _equipment_free(self, equipment_id: str, start: int, end: int) -> bool:
+        index = self._equipment_index_for(equipment_id)
+        with self._lock_equipment([equipment_id]):
+            return index.find_overlap(start, end) is None
+
+    def _pick_equipment(self, category: str, start: int, end: int, holders: Tuple[str, ...],
+                        taken: List[str]) -> Optional[str]:
+        """A free item of ``category``: one allocated to the room first, else
+        an unallocated one."""
+        for allocated_to, allocated in ((holders[0], None), (None, False)):
+            for eq in self.assets.find(category=category, allocated=allocated, allocated_to=allocated_to):
+                if eq.equipment_id not in taken and self._equipment_free(eq.equipment_id, start, end):
+                    return eq.equipment_id
+        return None
+
+    def _linked_bookings(self, reservation_id: int) -> List[EquipmentBooking]:
+        if self.assets is None:
+            return []
+        if self._store is not None:
+            # Load the items involved so their bookings are in memory.
+            for equipment_id in self._store.linked_equipment(reservation_id):
+                self._equipment_index_for(equipment_id)
+        return list(self._linked.get(reservation_id, []))
+
+    def _add_equipment_bookings(self, bookings: List[EquipmentBooking]):
+        """Callers hold the items' locks."""
+        for booking in bookings:
+            self._equipment_index[booking.equipment_id].add(booking)
+            self._track_equipment_booking(booking)
+        if self._store is not None and bookings:
+            self._store.add_equipment_bookings(bookings)
+
+    def _drop_equipment_bookings(self, bookings: List[EquipmentBooking]):
+        """Callers hold the items' locks."""
+        for booking in bookings:
+            self._equipment_index[booking.equipment_id].discard(booking)
+            self._untrack_equipment_booking(booking)
+        if self._store is not None and bookings:
+            self._store.delete_equipment_bookings([booking.id for booking in bookings])
+
+    def _track_equipment_booking(self, booking: EquipmentBooking):
+        self._equipment_bookings[booking.id] = booking
+        if booking.reservation_id is not None:
+            self._linked.setdefault(booking.reservation_id, []).append(booking)
+
+    def _untrack_equipment_booking(self, booking: EquipmentBooking):
+        self._equipment_bookings.pop(booking.id, None)
+        linked = self._linked.get(booking.reservation_id)
+        if linked is not None:
+            linked[:] = [b for b in linked if b is not booking]
+            if not linked:
+                del self._linked[booking.reservation_id]
+
+    def _all_occurrences(self, series: RecurringReservation) -> Iterator[Tuple[int, int]]:
+        return self._occurrences(series, to_epoch(series.start, self.tz, strict=False),
+                                 to_epoch(series.last_end, self.tz, strict=False))
+
+    def _notify(self, event: str, classroom_id: str, detail):
+        for listener in self._listeners:
+            listener(event, classroom_id, detail)
+
+    def _active_reservation(self, reservation_id: int) -> Reservation:
+        res = self.get_reservation(reservation_id)
+        if res is None:
+            raise ValueError(f"Reservation {reservation_id} not found")
+        return res
+
+    def _check_not_archived(self, start: int):
+        if self._archived_until is not None and start < self._archived_until:
+            raise ValueError(f"Bookings before {self._local(self._archived_until):%Y-%m-%d %H:%M} are archived.")
+
+    def _allocate_ids(self, count: int) -> int:
+        """Reserve ``count`` consecutive reservation ids and return the first."""
+        with self._id_lock:
+            first = self._next_reservation_id
+            self._next_reservation_id += count
+        return first
+
+    def _allocate_ticket_ids(self, count: int) -> int:
+        with self._id_lock:
+            first = self._next_ticket_id
+            self._next_ticket_id += count
+        return first
+
+    def _epoch(self, value: datetime) -> int:
+        return to_epoch(value, self.tz)
+
+    def _local(self, value: int) -> datetime:
+        return from_epoch(value, self.tz)
+
+    def _in_tz(self, bookings):
+        """Set the time zone ``start``/``end`` of bookings read back are shown in."""
+        for booking in bookings:
+            booking.tz = self.tz
+        return bookings
+
+    def _wall(self, value: datetime) -> datetime:
+        """Naive wall-clock time of ``value`` in the scheduler's time zone."""
+        if value.tzinfo is None:
+            return value
+        return value.astimezone(self.tz).replace(tzinfo=None)
+
+    def _window(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        start_us, end_us = self._epoch(start), self._epoch(end)
+        if end_us <= start_us:
+            raise ValueError("Reservation end must be after its start.")
+        return start_us, end_us
\ No newline at end of file
@@ -5,14 +5,20 @@ import os
 
 # Import all the modules
 from Classroom_Manager import Scheduler, Classroom, Reservation
+from scheduler_store import SQLiteSchedulerStore
 from equipment_management import (
-    EquipmentManager, Equipment, 
+    AssetRegistry, EquipmentManager, Equipment, 
     LicenseManager, SoftwareLicense, 
     PersonAllocationManager, LaboratoryEquipmentManager
 )
 from Student_Manager import StudentManager
 
 class UniversityManagementGUI:
+    # How far ahead the classroom tab lists bookings
+    SCHEDULE_HORIZON = timedelta(days=14)
+    # How often bookings still queued in the scheduler store are written out
+    FLUSH_INTERVAL_MS = 5000
+
     def __init__(self, root):
         self.root = root
         self.root.title("University Management System")
@@ -20,6 +26,8 @@ class UniversityManagementGUI:
         
         # Initialize managers
         self.setup_managers()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(self.FLUSH_INTERVAL_MS, self.flush_scheduler)
         
         # Create notebook (tabbed interface)
         self.notebook = ttk.Notebook(root)
@@ -36,11 +44,12 @@ class UniversityManagementGUI:
         
     def setup_managers(self):
         """Initialize all management systems"""
-        self.scheduler = Scheduler()
-        self.eq_manager = EquipmentManager()
+        self.assets = AssetRegistry()
+        self.scheduler = Scheduler(store=SQLiteSchedulerStore("scheduler.db"), assets=self.assets)
+        self.eq_manager = EquipmentManager(self.assets)
         self.license_manager = LicenseManager()
         self.person_manager = PersonAllocationManager()
-        self.lab_eq_manager = LaboratoryEquipmentManager()
+        self.lab_eq_manager = LaboratoryEquipmentManager(self.assets)
         self.student_manager = StudentManager()
         
         # Add some sample data
@@ -48,10 +57,11 @@ class UniversityManagementGUI:
     
     def add_sample_data(self):
         """Add sample data for demonstration"""
-        # Sample classrooms
-        self.scheduler.add_classroom(Classroom(id="R101", capacity=30, location="West Wing"))
-        self.scheduler.add_classroom(Classroom(id="R102", capacity=50, location="East Wing"))
-        self.scheduler.add_classroom(Classroom(id="R201", capacity=25, location="North Wing"))
+        # Sample classrooms (only on first run, later runs load them from scheduler.db)
+        if not self.scheduler.classrooms:
+            self.scheduler.add_classroom(Classroom(id="R101", capacity=30, location="West Wing"))
+            self.scheduler.add_classroom(Classroom(id="R102", capacity=50, location="East Wing"))
+            self.scheduler.add_classroom(Classroom(id="R201", capacity=25, location="North Wing"))
         
         # Sample equipment
         self.eq_manager.add_equipment(Equipment("E001", "Projector", "AV"))
@@ -71,14 +81,14 @@ class UniversityManagementGUI:
         self.person_manager.assign_professor("P002", "Mechanical Engineering")
         self.person_manager.assign_student("S001", "Computer Engineering")
         
-        # Sample student
-        self.student_manager.add_student({
+        # Sample student (skipped if the record is already on disk)
+        self.student_manager.seed([{
             "student_id": "007", 
             "first_name": "James", 
             "last_name": "Bond", 
             "department": "Spy School", 
             "enrollment_year": 2021
-        })
+        }])
 
     def create_classroom_tab(self):
         """Create classroom management tab"""
@@ -425,7 +435,7 @@ class UniversityManagementGUI:
     
     # Classroom Methods
     def get_classroom_ids(self):
-        return [room.id for room in self.scheduler.classrooms]
+        return self.scheduler.classroom_ids()
     
     def add_classroom(self):
         try:
@@ -479,18 +489,21 @@ class UniversityManagementGUI:
     def refresh_classroom_info(self):
         self.classroom_display.delete(1.0, tk.END)
         info = "=== CLASSROOMS ===\n\n"
+        now = datetime.now()
         for room in self.scheduler.classrooms:
             info += f"ID: {room.id}\n"
             info += f"Capacity: {room.capacity}\n"
             info += f"Location: {room.location}\n"
             info += f"Maintenance: {'Yes' if room.is_under_maintenance else 'No'}\n"
-            if room.maintenance_notes:
-                info += f"Maintenance Notes: {', '.join(room.maintenance_notes)}\n"
+            maintenance_notes = self.scheduler.get_maintenance_reports(room.id)
+            if maintenance_notes:
+                info += f"Maintenance Notes: {', '.join(maintenance_notes)}\n"
             
-            # Show reservations for this room
-            room_reservations = [r for r in self.scheduler.reservations if r.classroom_id == room.id]
+            # Show upcoming reservations for this room; older history stays
+            # in the store instead of being loaded at startup
+            room_reservations = self.scheduler.get_schedule(room.id, now, now + self.SCHEDULE_HORIZON)
             if room_reservations:
-                info += "Reservations:\n"
+                info += f"Reservations (next {self.SCHEDULE_HORIZON.days} days):\n"
                 for res in room_reservations:
                     info += f"  - {res.reserved_by}: {res.start.strftime('%Y-%m-%d %H:%M')} to {res.end.strftime('%H:%M')}\n"
             info += "\n" + "-"*40 + "\n\n"
@@ -499,7 +512,7 @@ class UniversityManagementGUI:
     
     # Equipment Methods
     def get_equipment_ids(self):
-        return list(self.eq_manager.equipment_list.keys())
+        return self.eq_manager.equipment_ids()
     
     def add_equipment(self):
         try:
@@ -598,7 +611,7 @@ class UniversityManagementGUI:
     
     # Lab Equipment Methods
     def get_lab_equipment_ids(self):
-        return list(self.lab_eq_manager.lab_equipment.keys())
+        return self.lab_eq_manager.lab_equipment_ids()
     
     def add_lab_equipment(self):
         try:
@@ -649,8 +662,7 @@ class UniversityManagementGUI:
     
     # Student Methods
     def get_student_ids(self):
-        students = self.student_manager.list_students()
-        return [student['student_id'] for student in students if 'student_id' in student]
+        return self.student_manager.student_ids()
     
     def add_student(self):
         try:
@@ -699,17 +711,29 @@ class UniversityManagementGUI:
     
     def list_students(self):
         self.student_display.delete(1.0, tk.END)
-        students = self.student_manager.list_students()
-        
-        info = "=== ALL STUDENTS ===\n\n"
-        for student in students:
-            info += f"ID: {student.get('student_id', 'N/A')}\n"
-            info += f"Name: {student.get('first_name', '')} {student.get('last_name', '')}\n"
-            info += f"Department: {student.get('department', 'N/A')}\n"
-            info += f"Enrollment Year: {student.get('enrollment_year', 'N/A')}\n"
-            info += "\n" + "-"*40 + "\n\n"
-        
-        self.student_display.insert(tk.END, info)
+        self.student_display.insert(tk.END, "=== ALL STUDENTS ===\n\n")
+        
+        # Render the first page right away and the rest from the event loop,
+        # so large registries neither freeze the UI nor sit in memory at once.
+        self._student_pages = self.student_manager.iter_students(batch_size=200)
+        self._render_student_page(self._student_pages)
+    
+    def _render_student_page(self, pages):
+        if pages is not self._student_pages:
+            return  # a newer listing has started
+        page = next(pages, None)
+        if page is None:
+            return
+        
+        parts = []
+        for student in page:
+            parts.append(f"ID: {student.get('student_id', 'N/A')}\n")
+            parts.append(f"Name: {student.get('first_name', '')} {student.get('last_name', '')}\n")
+            parts.append(f"Department: {student.get('department', 'N/A')}\n")
+            parts.append(f"Enrollment Year: {student.get('enrollment_year', 'N/A')}\n")
+            parts.append("\n" + "-"*40 + "\n\n")
+        self.student_display.insert(tk.END, "".join(parts))
+        self.root.after(1, self._render_student_page, pages)
     
     # People Allocation Methods
     def assign_professor(self):
@@ -758,21 +782,20 @@ class UniversityManagementGUI:
         # Classroom Summary
         info += "📚 CLASSROOMS:\n"
         info += f"  Total: {len(self.scheduler.classrooms)}\n"
-        maintenance_count = sum(1 for room in self.scheduler.classrooms if room.is_under_maintenance)
+        maintenance_count = self.scheduler.maintenance_count()
         info += f"  Under Maintenance: {maintenance_count}\n"
-        info += f"  Reservations: {len(self.scheduler.reservations)}\n\n"
+        info += f"  Reservations: {self.scheduler.reservation_count()}\n\n"
         
         # Equipment Summary
+        assets = self.assets.summary()
         info += "🛠️ EQUIPMENT:\n"
-        info += f"  General Equipment: {len(self.eq_manager.equipment_list)}\n"
-        allocated_eq = sum(1 for eq in self.eq_manager.track_equipment() if eq['allocated'])
-        info += f"  Allocated: {allocated_eq}\n\n"
+        info += f"  General Equipment: {assets['general']['total']}\n"
+        info += f"  Allocated: {assets['general']['allocated']}\n\n"
         
         # Lab Equipment Summary
         info += "🔬 LAB EQUIPMENT:\n"
-        info += f"  Total: {len(self.lab_eq_manager.lab_equipment)}\n"
-        allocated_lab = sum(1 for eq in self.lab_eq_manager.track_lab_equipment() if eq['allocated'])
-        info += f"  Allocated: {allocated_lab}\n\n"
+        info += f"  Total: {assets['lab']['total']}\n"
+        info += f"  Allocated: {assets['lab']['allocated']}\n\n"
         
         # License Summary
         info += "💻 SOFTWARE LICENSES:\n"
@@ -790,16 +813,25 @@ class UniversityManagementGUI:
         info += f"  Students: {len(people_data['students'])}\n\n"
         
         # Student Records Summary
-        students = self.student_manager.list_students()
         info += "🎓 STUDENT RECORDS:\n"
-        info += f"  Total Students: {len(students)}\n"
+        info += f"  Total Students: {self.student_manager.count_students()}\n"
         
         self.dashboard_display.insert(tk.END, info)
 
+    def flush_scheduler(self):
+        """Write queued bookings to scheduler.db, then check again later"""
+        self.scheduler.flush()
+        self.root.after(self.FLUSH_INTERVAL_MS, self.flush_scheduler)
+
+    def on_close(self):
+        self.scheduler.flush()
+        self.root.destroy()
+
 def main():
     root = tk.Tk()
     app = UniversityManagementGUI(root)
     root.mainloop()
+    app.scheduler.flush()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
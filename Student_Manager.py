@@ -1,66 +1,474 @@
-import shutil
-shutil.rmtree("students", ignore_errors=True)
-
 import os
+import csv
+import json
+import time
+import sqlite3
+import zlib
+import operator
+import threading
+from itertools import islice
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialised
+    fcntl = None
+
+
+class StudentExistsError(ValueError):
+    """A student with this id is already stored."""
+
+
+class StudentConflictError(Exception):
+    """The record changed since the caller read it (version mismatch)."""
+
+    def __init__(self, student_id, expected, actual):
+        super().__init__(
+            f"Student {student_id} is at version {actual}, expected {expected}.")
+        self.student_id = student_id
+        self.expected = expected
+        self.actual = actual
+
 
 class StudentManager:
-    def __init__(self, folder="students"):
+    # Fields compared as numbers rather than strings by find_students().
+    FIELD_TYPES = {"enrollment_year": int, "gpa": float}
+
+    # Every record carries a version number, bumped on each edit, which
+    # callers can pass back as expected_version for optimistic updates. It
+    # is kept out of the records handed out (see get_student_version()),
+    # so exports don't carry it and imports start again at version 1.
+    VERSION_FIELD = "_version"
+
+    # Writers take one of these advisory locks (by hash of the student id)
+    # around read-modify-write, across threads and processes alike.
+    LOCK_STRIPES = 64
+
+    # Column order used when exporting to CSV.
+    EXPORT_FIELDS = ("student_id", "first_name", "last_name", "dob", "department",
+                     "email", "enrollment_year", "gpa", "status")
+
+    _OPERATORS = {
+        "eq": operator.eq,
+        "ne": operator.ne,
+        "lt": operator.lt,
+        "lte": operator.le,
+        "gt": operator.gt,
+        "gte": operator.ge,
+    }
+
+    def __init__(self, folder="students", cache_size=1024,
+                 indexed_fields=("department", "status", "enrollment_year"),
+                 fsync=True):
         self.folder = folder
         if not os.path.exists(folder):
             os.makedirs(folder)
 
+        # Records are written to a temp file and renamed into place. With
+        # fsync on, each record is flushed to disk before the rename; inside
+        # batch_writes() the flushes are deferred to the end of the batch.
+        # Batches are per thread: one thread's batch never holds back the
+        # fsync of a write made by another.
+        self.fsync = fsync
+        self._batch = threading.local()
+
+        # LRU cache of parsed records: student_id -> (file signature, record).
+        # A cached record is only served while the file's signature matches,
+        # so edits made by other processes are picked up on the next read.
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+
+        # Secondary indexes: field -> value -> set of student ids. They are
+        # built from disk on the first query and kept current by every write.
+        # Writes by other managers or processes move the folder's mtime; the
+        # next query then re-reads the files whose signature changed.
+        self.indexed_fields = tuple(indexed_fields)
+        self._indexes = None
+        self._indexed_values = {}
+        self._indexed_sigs = {}
+        self._folder_mtime = None
+
+        self._thread_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        # Guards the cache and the indexes, which threads share in memory.
+        self._state_lock = threading.RLock()
+
+    @staticmethod
+    def _valid_id(student_id):
+        # Ids become file names: refuse anything that could leave the folder
+        # or collide with the hidden lock and temp files.
+        return bool(student_id) and not student_id.startswith(".") and not any(
+            c in student_id for c in "/\\:\0")
+
     def _path(self, student_id):
+        student_id = str(student_id)
+        if not self._valid_id(student_id):
+            raise ValueError(f"invalid student_id {student_id!r}")
         return os.path.join(self.folder, f"{student_id}.txt")
 
-    # Add Student
-    def add_student(self, student):
-        path = self._path(student["student_id"])
+    @staticmethod
+    def _serialise(student):
+        return "".join(f"{key}: {value}\n" for key, value in student.items())
 
-        if os.path.exists(path):
-            raise ValueError("Student already exists.")
+    @staticmethod
+    def _parse(text):
+        student = {}
+        for line in text.splitlines():
+            if ":" in line:
+                key, value = line.strip().split(":", 1)
+                student[key.strip()] = value.strip()
+        return student
 
-        with open(path, "w", encoding="utf-8") as f:
-            for key, value in student.items():
-                f.write(f"{key}: {value}\n")
+    @staticmethod
+    def _signature(st):
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
 
-    # Read Student File
-    def get_student(self, student_id):
+    def _write(self, student_id, student, create=False, cache=True):
         path = self._path(student_id)
-        if not os.path.exists(path):
-            return None
+        if create:
+            student = {**student, self.VERSION_FIELD: 1}
+        text = self._serialise(student)
+        fd, tmp = self._temp_file()
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+                if self.fsync and not self._batch_depth():
+                    f.flush()
+                    os.fsync(f.fileno())
+            if create:
+                # Linking fails if the target exists, which makes creation
+                # exclusive (like O_EXCL) without ever exposing a partial file.
+                try:
+                    os.link(tmp, path)
+                except FileExistsError:
+                    raise StudentExistsError("Student already exists.")
+                os.remove(tmp)
+            else:
+                os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
 
-        student = {}
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                if ":" in line:
-                    key, value = line.strip().split(":", 1)
-                    student[key.strip()] = value.strip()
+        if self.fsync:
+            if self._batch_depth():
+                self._batch.unsynced.append(path)
+            else:
+                self._sync_folder()
+        record = self._parse(text)
+        st = os.stat(path)
+        if cache:
+            self._cache_put(student_id, st, record)
+        self._index_add(str(student_id), record, self._signature(st))
+
+    def _temp_file(self):
+        # Not tempfile.mkstemp(): it creates files 0600, and the rename would
+        # publish every record owner-only. Here the umask decides, as it did
+        # when records were written in place.
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        while True:
+            tmp = os.path.join(self.folder, f".{os.urandom(8).hex()}.tmp")
+            try:
+                return os.open(tmp, flags, 0o666), tmp
+            except FileExistsError:
+                continue
+
+    def _sync_folder(self):
+        # Persist the rename itself; directories can't be opened on Windows.
+        if hasattr(os, "O_DIRECTORY"):
+            fd = os.open(self.folder, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
 
+    @contextmanager
+    def _locked(self, student_id):
+        stripe = zlib.crc32(str(student_id).encode("utf-8")) % self.LOCK_STRIPES
+        with self._thread_locks[stripe]:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(os.path.join(self.folder, f".lock-{stripe:02d}"),
+                         os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _check_version(self, student_id, student, expected_version):
+        actual = int(student.get(self.VERSION_FIELD, 0))
+        if expected_version is not None and int(expected_version) != actual:
+            raise StudentConflictError(student_id, int(expected_version), actual)
+        return actual
+
+    def _batch_depth(self):
+        return getattr(self._batch, "depth", 0)
+
+    @contextmanager
+    def batch_writes(self):
+        """Defer fsync of every record this thread writes inside the block
+        to its end."""
+        batch = self._batch
+        if not self._batch_depth():
+            batch.unsynced = []
+        batch.depth = self._batch_depth() + 1
+        try:
+            yield self
+        finally:
+            batch.depth -= 1
+            if not batch.depth and batch.unsynced:
+                paths, batch.unsynced = batch.unsynced, []
+                for path in paths:
+                    try:
+                        fd = os.open(path, os.O_RDONLY)
+                    except FileNotFoundError:
+                        continue
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                self._sync_folder()
+
+    # -------------------------
+    # Cache
+    # -------------------------
+    def _cache_put(self, student_id, st, student):
+        if self.cache_size <= 0:
+            return
+        student_id = str(student_id)
+        with self._state_lock:
+            self._cache[student_id] = (self._signature(st), student)
+            self._cache.move_to_end(student_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self.cache_evictions += 1
+
+    def cache_info(self):
+        with self._state_lock:
+            return {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "evictions": self.cache_evictions,
+                "size": len(self._cache),
+                "max_size": self.cache_size,
+            }
+
+    def clear_cache(self):
+        with self._state_lock:
+            self._cache.clear()
+
+    # -------------------------
+    # Secondary indexes
+    # -------------------------
+
+    def _build_indexes(self):
+        # Called with _state_lock held, so concurrent queries build once.
+        self._indexes = {field: {} for field in self.indexed_fields}
+        self._indexed_values = {}
+        self._indexed_sigs = {}
+        self._folder_mtime = None
+        self._refresh_indexes()
+
+    def _refresh_indexes(self):
+        """Bring the indexes up to date with the folder. Callers hold _state_lock."""
+        mtime = os.stat(self.folder).st_mtime_ns
+        if mtime == self._folder_mtime:
+            return
+        # Taken before the scan, so a change during it shows up next time.
+        self._folder_mtime = mtime
+        seen = set()
+        with os.scandir(self.folder) as entries:
+            files = [e for e in entries if e.name.endswith(".txt")]
+        for entry in files:
+            student_id = entry.name[:-4]
+            seen.add(student_id)
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            # DirEntry has no inode number in its stat result on Windows.
+            sig = (entry.inode(), st.st_mtime_ns, st.st_size)
+            if self._indexed_sigs.get(student_id) != sig:
+                student = self.get_student(student_id)
+                if student is not None:
+                    self._index_add(student_id, student, sig)
+        for student_id in self._indexed_values.keys() - seen:
+            self._index_remove(student_id)
+
+    def _index_add(self, student_id, student, sig=None):
+        with self._state_lock:
+            if self._indexes is None:
+                return
+            self._index_remove(student_id)
+            values = {f: student[f] for f in self.indexed_fields if f in student}
+            for field, value in values.items():
+                self._indexes[field].setdefault(value, set()).add(student_id)
+            self._indexed_values[student_id] = values
+            self._indexed_sigs[student_id] = sig
+
+    def _index_remove(self, student_id):
+        with self._state_lock:
+            if self._indexes is None:
+                return
+            self._indexed_sigs.pop(student_id, None)
+            for field, value in self._indexed_values.pop(student_id, {}).items():
+                ids = self._indexes[field].get(value)
+                if ids is not None:
+                    ids.discard(student_id)
+                    if not ids:
+                        del self._indexes[field][value]
+
+    def _matches(self, field, raw, op, value):
+        if raw is None:
+            return False
+        convert = self.FIELD_TYPES.get(field, str)
+        try:
+            return self._OPERATORS[op](convert(raw), convert(value))
+        except (TypeError, ValueError):
+            return False
+
+    def _conditions(self, criteria):
+        conditions = []
+        for key, value in criteria.items():
+            field, _, op = key.rpartition("__")
+            if not field or op not in self._OPERATORS:
+                field, op = key, "eq"
+            conditions.append((field, op, value))
+        return conditions
+
+    # Find Students
+    def find_students(self, **criteria):
+        """Return students matching every criterion.
+
+        ``field=value`` tests equality; ``field__op=value`` with op one of
+        ne/lt/lte/gt/gte compares, numerically for fields in FIELD_TYPES.
+        Indexed fields narrow the candidates before any file is read, e.g.
+        ``find_students(department="Computer Engineering", gpa__gte=3)``.
+        Records changed by other managers on the same folder are picked up
+        by the next query.
+        """
+        conditions = self._conditions(criteria)
+        candidates = None
+        with self._state_lock:
+            if self._indexes is None:
+                self._build_indexes()
+            else:
+                self._refresh_indexes()
+            for field, op, value in conditions:
+                index = self._indexes.get(field)
+                if index is None:
+                    continue
+                ids = set()
+                for key, key_ids in index.items():
+                    if self._matches(field, key, op, value):
+                        ids |= key_ids
+                candidates = ids if candidates is None else candidates & ids
+        if candidates is None:
+            candidates = self.student_ids()
+
+        results = []
+        for student_id in sorted(candidates):
+            student = self.get_student(student_id)
+            if student is not None and all(
+                self._matches(field, student.get(field), op, value)
+                for field, op, value in conditions
+            ):
+                results.append(student)
+        return results
+
+    # Add Student
+    def add_student(self, student):
+        self._write(student["student_id"], student, create=True)
+
+    # Read Student File
+    def get_student(self, student_id, use_cache=True):
+        student = self._read(student_id, use_cache)
+        if student is not None:
+            student.pop(self.VERSION_FIELD, None)
         return student
 
-    # Delete Student
-    def delete_student(self, student_id):
+    def get_student_version(self, student_id):
+        """``(student, version)``, the version to pass back as expected_version;
+        ``(None, None)`` if there is no such student."""
+        student = self._read(student_id)
+        if student is None:
+            return None, None
+        return student, int(student.pop(self.VERSION_FIELD, 0))
+
+    def _read(self, student_id, use_cache=True):
+        """The stored record, version field included."""
+        student_id = str(student_id)
         path = self._path(student_id)
-        if os.path.exists(path):
-            os.remove(path)
-            return True
-        return False
+        cached = self._cache.get(student_id) if use_cache else None
+        if cached is not None:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                self._cache.pop(student_id, None)
+                return None
+            if cached[0] == self._signature(st):
+                with self._state_lock:
+                    self.cache_hits += 1
+                    if student_id in self._cache:
+                        self._cache.move_to_end(student_id)
+                return dict(cached[1])
+
+        if use_cache:
+            with self._state_lock:
+                self.cache_misses += 1
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                st = os.fstat(f.fileno())
+                student = self._parse(f.read())
+        except FileNotFoundError:
+            self._cache.pop(student_id, None)
+            return None
+        self._cache_put(student_id, st, student)
+        return dict(student)
+
+    # Delete Student
+    def delete_student(self, student_id, expected_version=None):
+        with self._locked(student_id):
+            if expected_version is not None:
+                student = self._read(student_id, use_cache=False)
+                if student is not None:
+                    self._check_version(student_id, student, expected_version)
+            path = self._path(student_id)
+            self._cache.pop(str(student_id), None)
+            self._index_remove(str(student_id))
+            try:
+                os.remove(path)
+                return True
+            except FileNotFoundError:
+                return False
 
     # Edit Student File
-    def edit_student(self, student_id, updates):
-        student = self.get_student(student_id)
-        if student is None:
-            return False
+    def edit_student(self, student_id, updates, expected_version=None):
+        # The lock makes read-modify-write atomic against other writers; with
+        # expected_version the edit also fails if the record moved on since
+        # the caller last read it.
+        with self._locked(student_id):
+            # Read from disk: a cache signature can't tell apart two writes
+            # that land within one mtime tick on a recycled inode.
+            student = self._read(student_id, use_cache=False)
+            if student is None:
+                return False
+            version = self._check_version(student_id, student, expected_version)
 
-        # apply updates
-        for key, value in updates.items():
-            student[key] = value
+            # apply updates; the version only moves on here
+            for key, value in updates.items():
+                if key != self.VERSION_FIELD:
+                    student[key] = value
+            student[self.VERSION_FIELD] = version + 1
 
-        # rewrite file
-        path = self._path(student_id)
-        with open(path, "w", encoding="utf-8") as f:
-            for k, v in student.items():
-                f.write(f"{k}: {v}\n")
+            # rewrite file
+            self._write(student_id, student)
 
         return True
 
@@ -73,6 +481,221 @@ class StudentManager:
                 data.append(self.get_student(student_id))
         return data
 
+    # Student IDs straight from the directory entries, without opening files
+    def student_ids(self):
+        with os.scandir(self.folder) as entries:
+            return sorted(e.name[:-4] for e in entries if e.name.endswith(".txt"))
+
+    def count_students(self):
+        with os.scandir(self.folder) as entries:
+            return sum(1 for e in entries if e.name.endswith(".txt"))
+
+    # Iterate Students Page by Page
+    def iter_students(self, batch_size=100, sort_key=None, cursor=None, offset=0):
+        """Yield students as lists of at most ``batch_size`` records.
+
+        Records are read one page at a time. Pages are ordered by student id,
+        or by the ``sort_key`` field (then id, records missing it last).
+        ``cursor`` is the id of the last student already seen and resumes
+        right after it; in id order this holds even if that student has
+        since been deleted. ``offset`` skips that many students instead.
+        """
+        ids = self.student_ids()
+        if sort_key is not None:
+            if sort_key in self.indexed_fields:
+                with self._state_lock:
+                    if self._indexes is None:
+                        self._build_indexes()
+                    else:
+                        self._refresh_indexes()
+                    values = {sid: v.get(sort_key) for sid, v in self._indexed_values.items()}
+            else:
+                values = {sid: (self.get_student(sid) or {}).get(sort_key) for sid in ids}
+            convert = self.FIELD_TYPES.get(sort_key, str)
+
+            def order(sid):
+                try:
+                    return (0, convert(values[sid]), sid)
+                except (KeyError, TypeError, ValueError):
+                    return (1, 0, sid)
+
+            ids.sort(key=order)
+            if cursor is not None:
+                if cursor not in values:
+                    raise ValueError(f"Unknown cursor: {cursor}")
+                offset = bisect_right([order(sid) for sid in ids], order(cursor))
+        elif cursor is not None:
+            offset = bisect_right(ids, str(cursor))
+
+        for i in range(offset, len(ids), batch_size):
+            page = []
+            for student_id in ids[i:i + batch_size]:
+                student = self.get_student(student_id)
+                if student is not None:
+                    page.append(student)
+            if page:
+                yield page
+
+    # -------------------------
+    # Bulk import / export
+    # -------------------------
+    def validate_student(self, student):
+        """Return a list of problems with ``student``; empty if it can be stored."""
+        if not isinstance(student, dict):
+            return ["record is not an object"]
+        errors = []
+        student_id = str(student.get("student_id", "")).strip()
+        if not student_id:
+            errors.append("missing student_id")
+        elif not self._valid_id(student_id):
+            errors.append(f"invalid student_id {student_id!r}")
+        for key, value in student.items():
+            if not str(key).strip() or ":" in str(key):
+                errors.append(f"invalid field name {key!r}")
+            elif "\n" in str(value) or "\r" in str(value):
+                errors.append(f"{key} contains a line break")
+        for field, convert in self.FIELD_TYPES.items():
+            if student.get(field) not in (None, ""):
+                try:
+                    convert(student[field])
+                except (TypeError, ValueError):
+                    errors.append(f"{field} is not a valid {convert.__name__}")
+        return errors
+
+    def add_students(self, students):
+        """Bulk write path: add many records with one deferred fsync.
+
+        Bulk writes bypass the read cache so an import does not evict the
+        hot set. Returns ``(added, errors)`` where errors are
+        ``(position, message)`` pairs counted from 1; bad records are skipped.
+        """
+        return self._add_numbered(enumerate(students, start=1))
+
+    def _add_numbered(self, numbered):
+        added, errors = 0, []
+        with self.batch_writes():
+            for position, student in numbered:
+                problems = self.validate_student(student)
+                if problems:
+                    errors.append((position, "; ".join(problems)))
+                    continue
+                try:
+                    self._write(str(student["student_id"]).strip(), student,
+                                create=True, cache=False)
+                    added += 1
+                except (ValueError, OSError) as e:
+                    errors.append((position, str(e)))
+        return added, errors
+
+    @staticmethod
+    def _read_records(path, file_format):
+        with open(path, newline="", encoding="utf-8") as f:
+            if file_format == "csv":
+                for row in csv.DictReader(f):
+                    # Blank cells mean "field not set" for sparse records.
+                    yield {k: v for k, v in row.items() if k and v not in (None, "")}
+            else:
+                for line in f:
+                    if line.strip():
+                        # Bad lines are passed on as the error itself so the
+                        # caller can report them by row and keep going.
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError as e:
+                            yield e
+
+    @staticmethod
+    def _file_format(path, file_format):
+        file_format = file_format or os.path.splitext(path)[1].lstrip(".").lower()
+        if file_format == "json":
+            file_format = "jsonl"
+        if file_format not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported format: {file_format!r} (use csv or jsonl)")
+        return file_format
+
+    # Import Students
+    def import_students(self, source, file_format=None, chunk_size=1000):
+        """Import records from a CSV/JSON Lines file or an iterable of dicts.
+
+        The source is streamed ``chunk_size`` records at a time. Invalid or
+        duplicate rows are reported and skipped rather than aborting the
+        import; row numbers count records from 1.
+        """
+        started = time.perf_counter()
+        if isinstance(source, (str, os.PathLike)):
+            records = self._read_records(source, self._file_format(str(source), file_format))
+        else:
+            records = iter(source)
+
+        numbered = enumerate(records, start=1)
+        imported, errors = 0, []
+        while True:
+            chunk = list(islice(numbered, chunk_size))
+            if not chunk:
+                break
+            bad = [(n, f"unreadable record: {r}") for n, r in chunk if isinstance(r, Exception)]
+            added, chunk_errors = self._add_numbered(
+                (n, r) for n, r in chunk if not isinstance(r, Exception))
+            imported += added
+            errors.extend(sorted(bad + chunk_errors))
+
+        elapsed = time.perf_counter() - started
+        return {
+            "imported": imported,
+            "errors": errors,
+            "seconds": elapsed,
+            "records_per_sec": imported / elapsed if elapsed else 0.0,
+        }
+
+    # Export Students
+    def export_students(self, path, file_format=None, fields=None, chunk_size=1000):
+        """Stream every student to a CSV or JSON Lines file, page by page.
+
+        CSV output has one column per entry of ``fields`` (EXPORT_FIELDS by
+        default); JSON Lines output keeps every field of every record.
+        """
+        started = time.perf_counter()
+        file_format = self._file_format(str(path), file_format)
+        exported = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if file_format == "csv":
+                writer = csv.DictWriter(f, fieldnames=list(fields or self.EXPORT_FIELDS),
+                                        extrasaction="ignore")
+                writer.writeheader()
+            for page in self.iter_students(batch_size=chunk_size):
+                if file_format == "csv":
+                    writer.writerows(page)
+                else:
+                    f.writelines(json.dumps(st) + "\n" for st in page)
+                exported += len(page)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "exported": exported,
+            "seconds": elapsed,
+            "records_per_sec": exported / elapsed if elapsed else 0.0,
+        }
+
+    # -------------------------
+    # Reset / seed
+    # -------------------------
+    def reset(self):
+        """Delete every student record in the folder."""
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.name.endswith(".txt") or (entry.name.startswith(".") and entry.name.endswith(".tmp")):
+                    os.remove(entry.path)
+        self._cache.clear()
+        self._indexes = None
+        self._indexed_values = {}
+
+    def seed(self, students):
+        """Add sample records whose student_id is not taken yet; returns how many were added."""
+        existing = set(self.student_ids())
+        added, _ = self.add_students(
+            st for st in students if str(st["student_id"]) not in existing)
+        return added
+
     # Print Student 
     def print_student(self, student):
         if student is None:
@@ -85,13 +708,156 @@ class StudentManager:
         print("---------------------------\n")
 
 
+class SQLiteStudentManager(StudentManager):
+    """StudentManager backed by one SQLite table keyed on student_id.
+
+    Listing is a single table scan and lookups go through the primary key,
+    instead of one file open per student. Validation, versions, paging,
+    seeding and import/export are inherited; there is no record cache or
+    secondary index, so find_students() filters a table scan. The
+    connection belongs to the thread that opened it.
+    """
+
+    def __init__(self, path="students.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS students ("
+            "student_id TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID"
+        )
+        # Inside batch_writes() records are committed at the end of the batch.
+        self._batch = threading.local()
+        self.indexed_fields = ()
+        self.cache_size = 0
+        self._cache = OrderedDict()
+        self.cache_hits = self.cache_misses = self.cache_evictions = 0
+        self._state_lock = threading.RLock()
+
+    # Values are stored as strings, matching what the text files give back.
+    @staticmethod
+    def _encode(student):
+        return json.dumps({str(k): str(v) for k, v in student.items()})
+
+    def _write(self, student_id, student, create=False, cache=True):
+        student_id = str(student_id)
+        if not self._valid_id(student_id):
+            raise ValueError(f"invalid student_id {student_id!r}")
+        if create:
+            try:
+                self._conn.execute(
+                    "INSERT INTO students (student_id, data) VALUES (?, ?)",
+                    (student_id, self._encode({**student, self.VERSION_FIELD: 1})),
+                )
+            except sqlite3.IntegrityError:
+                raise StudentExistsError("Student already exists.")
+        else:
+            self._conn.execute(
+                "UPDATE students SET data = ? WHERE student_id = ?",
+                (self._encode(student), student_id),
+            )
+        if not self._batch_depth():
+            self._conn.commit()
+
+    @contextmanager
+    def batch_writes(self):
+        """Commit every record written inside the block in one transaction."""
+        self._batch.depth = self._batch_depth() + 1
+        try:
+            yield self
+        finally:
+            self._batch.depth -= 1
+            if not self._batch.depth:
+                self._conn.commit()
+
+    def _read(self, student_id, use_cache=True):
+        row = self._conn.execute(
+            "SELECT data FROM students WHERE student_id = ?", (str(student_id),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # Delete Student
+    def delete_student(self, student_id, expected_version=None):
+        with self._conn:
+            if expected_version is not None:
+                student = self._read(student_id)
+                if student is not None:
+                    self._check_version(student_id, student, expected_version)
+            cur = self._conn.execute(
+                "DELETE FROM students WHERE student_id = ?", (str(student_id),)
+            )
+        return cur.rowcount > 0
+
+    # Edit Student
+    def edit_student(self, student_id, updates, expected_version=None):
+        with self._conn:
+            student = self._read(student_id)
+            if student is None:
+                return False
+            version = self._check_version(student_id, student, expected_version)
+            for key, value in updates.items():
+                if key != self.VERSION_FIELD:
+                    student[key] = value
+            student[self.VERSION_FIELD] = version + 1
+            self._conn.execute(
+                "UPDATE students SET data = ? WHERE student_id = ?",
+                (self._encode(student), str(student_id)),
+            )
+        return True
+
+    # List All Students
+    def list_students(self):
+        rows = self._conn.execute("SELECT data FROM students ORDER BY student_id")
+        students = [json.loads(data) for (data,) in rows]
+        for student in students:
+            student.pop(self.VERSION_FIELD, None)
+        return students
+
+    def student_ids(self):
+        return [sid for (sid,) in self._conn.execute("SELECT student_id FROM students ORDER BY student_id")]
+
+    def count_students(self):
+        return self._conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    # Find Students
+    def find_students(self, **criteria):
+        """Return students matching every criterion (see StudentManager.find_students)."""
+        conditions = self._conditions(criteria)
+        return [student for student in self.list_students() if all(
+            self._matches(field, student.get(field), op, value)
+            for field, op, value in conditions
+        )]
+
+    def reset(self):
+        """Delete every student record."""
+        with self._conn:
+            self._conn.execute("DELETE FROM students")
+
+    # One-shot import of an existing students/ folder
+    def migrate_from_folder(self, folder="students"):
+        if not os.path.isdir(folder):
+            return 0
+        # Keep the stored versions: clients may still hold them.
+        legacy = StudentManager(folder)
+        records = [st for st in map(legacy._read, legacy.student_ids()) if st]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO students (student_id, data) VALUES (?, ?)",
+                [(str(st["student_id"]), self._encode(st)) for st in records if "student_id" in st],
+            )
+        return len(records)
+
+    def close(self):
+        self._conn.close()
+
+
 # EXAMPLE USAGE (DEMO)
 if __name__ == "__main__":
     manager = StudentManager()
 
-    # Add Students
+    # Add Students (skipped if kept from a previous run)
     print("Add students:\n")
-    manager.add_student({
+    manager.seed([{
         "student_id": "001",
         "first_name": "Maria",
         "last_name": "Ibraheem",
@@ -101,9 +867,7 @@ if __name__ == "__main__":
         "enrollment_year": 2019,
         "gpa": 2.2,
         "status": "enrolled"
-    })
-
-    manager.add_student({
+    }, {
         "student_id": "002",
         "first_name": "Mark",
         "last_name": "Magdy",
@@ -113,7 +877,7 @@ if __name__ == "__main__":
         "enrollment_year": 2020,
         "gpa": 3.5,
         "status": "enrolled"
-    })
+    }])
 
     # List students 
     print("Listing all students:")
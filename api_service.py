@@ -0,0 +1,531 @@
+# api_service.py
+# Local HTTP/JSON front-end for all managers, built on asyncio streams.
+# Usage: python api_service.py [--host 127.0.0.1] [--port 8080] [--data-dir .]
+import argparse
+import asyncio
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime, timedelta
+from urllib.parse import parse_qsl, urlsplit
+
+from Classroom_Manager import Scheduler, Classroom, EquipmentBooking, Reservation, from_epoch
+from asset_store import SQLiteAssetStore
+from equipment_management import (
+    AllocationRecord, AssetRegistry, EquipmentManager, Equipment,
+    LicenseManager, SoftwareLicense,
+    PersonAllocationManager, LaboratoryEquipmentManager
+)
+from Student_Manager import StudentManager, StudentExistsError, StudentConflictError
+from scheduler_store import SQLiteSchedulerStore
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Versioned:
+    """A handler result sent with its record version as the ETag header."""
+
+    def __init__(self, payload, version):
+        self.payload = payload
+        self.version = version
+
+
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 409: "Conflict", 500: "Internal Server Error"}
+
+
+def _to_json(value):
+    if isinstance(value, Versioned):
+        return value.payload
+    if is_dataclass(value):
+        data = {f.name: getattr(value, f.name) for f in fields(value)}
+        if isinstance(value, (Reservation, EquipmentBooking)):
+            # Epoch fields stay for clients that want them; start/end are
+            # aware ISO timestamps in UTC rather than server wall-clock time.
+            del data["tz"]
+            data["start"], data["end"] = from_epoch(value.start_us), from_epoch(value.end_us)
+        return data
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serialisable")
+
+
+def _parse_time(value, name):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be an ISO 8601 timestamp")
+
+
+def _parse_date(value, name):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be an ISO 8601 date")
+
+
+def _parse_flag(params, name):
+    """Optional true/false query parameter; None when absent."""
+    if name not in params:
+        return None
+    value = params[name].lower()
+    if value not in ("true", "false", "1", "0"):
+        raise HTTPError(400, f"{name} must be true or false")
+    return value in ("true", "1")
+
+
+class UniversityService:
+    """Routes HTTP requests to the managers.
+
+    Scheduler, StudentManager and AssetRegistry calls lock their own
+    in-memory state and may block on disk, so they run in a thread pool
+    and requests for different rooms or students proceed concurrently;
+    equipment and lab equipment live in the registry, and equipment
+    bookings go through the Scheduler too. The in-memory license and
+    people managers are not thread-safe; their handlers run on the event
+    loop itself, which serialises them.
+    """
+
+    def __init__(self, data_dir=".", workers=8):
+        self.assets = AssetRegistry(store=SQLiteAssetStore(os.path.join(data_dir, "assets.db")))
+        self.scheduler = Scheduler(store=SQLiteSchedulerStore(os.path.join(data_dir, "scheduler.db")),
+                                   assets=self.assets)
+        self.student_manager = StudentManager(os.path.join(data_dir, "students"))
+        self.eq_manager = EquipmentManager(self.assets)
+        self.lab_eq_manager = LaboratoryEquipmentManager(self.assets)
+        self.license_manager = LicenseManager()
+        self.person_manager = PersonAllocationManager()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+        # (method, path pattern, handler, runs in the thread pool)
+        self._routes = []
+        for method, pattern, handler, blocking in [
+            ("GET", "/classrooms", self.list_classrooms, False),
+            ("POST", "/classrooms", self.add_classroom, True),
+            ("GET", "/classrooms/{id}/maintenance", self.get_maintenance, False),
+            ("POST", "/classrooms/{id}/maintenance", self.report_maintenance, True),
+            ("DELETE", "/classrooms/{id}/maintenance", self.resolve_maintenance, True),
+            ("GET", "/maintenance/blocked", self.blocked_rooms, False),
+            ("POST", "/maintenance/windows", self.close_rooms, True),
+            ("POST", "/maintenance/{id}/resolve", self.resolve_ticket, True),
+            ("GET", "/classrooms/{id}/reservations", self.list_reservations, True),
+            ("GET", "/classrooms/{id}/recurring", self.list_recurring, True),
+            ("GET", "/classrooms/{id}/schedule", self.get_schedule, True),
+            ("POST", "/reservations", self.reserve, True),
+            ("POST", "/reservations/batch", self.reserve_many, True),
+            ("POST", "/reservations/compact", self.compact_reservations, True),
+            ("POST", "/reservations/recurring", self.reserve_recurring, True),
+            ("POST", "/reservations/{id}/skip", self.skip_occurrence, True),
+            ("GET", "/reservations/{id}", self.get_reservation, True),
+            ("PUT", "/reservations/{id}", self.reschedule, True),
+            ("DELETE", "/reservations/{id}", self.cancel_reservation, True),
+            ("GET", "/availability", self.check_availability, True),
+            ("GET", "/free-rooms", self.find_free_rooms, True),
+            ("GET", "/free-equipment", self.free_equipment, True),
+            ("POST", "/equipment-bookings", self.reserve_equipment, True),
+            ("DELETE", "/equipment-bookings/{id}", self.cancel_equipment_booking, True),
+            ("GET", "/assets", self.list_assets, True),
+            ("GET", "/assets/summary", self.asset_summary, True),
+            ("GET", "/assets/{id}/history", self.asset_history, True),
+            ("GET", "/assets/{id}/bookings", self.equipment_bookings, True),
+            ("GET", "/equipment", self.list_equipment, True),
+            ("POST", "/equipment", self.add_equipment, True),
+            ("POST", "/equipment/{id}/allocate", self.allocate_equipment, True),
+            ("POST", "/equipment/{id}/release", self.release_equipment, True),
+            ("GET", "/lab-equipment", self.list_lab_equipment, True),
+            ("POST", "/lab-equipment", self.add_lab_equipment, True),
+            ("POST", "/lab-equipment/{id}/allocate", self.allocate_lab_equipment, True),
+            ("POST", "/lab-equipment/{id}/release", self.release_lab_equipment, True),
+            ("GET", "/licenses", self.list_licenses, False),
+            ("POST", "/licenses", self.add_license, False),
+            ("POST", "/licenses/{id}/allocate", self.allocate_license, False),
+            ("POST", "/licenses/{id}/release", self.release_license, False),
+            ("GET", "/people", self.list_people, False),
+            ("POST", "/people/professors", self.assign_professor, False),
+            ("PUT", "/people/professors/{id}", self.move_professor, False),
+            ("POST", "/people/students", self.assign_student, False),
+            ("GET", "/students", self.list_students, True),
+            ("GET", "/students/search", self.find_students, True),
+            ("POST", "/students", self.add_student, True),
+            ("GET", "/students/{id}", self.get_student, True),
+            ("PATCH", "/students/{id}", self.edit_student, True),
+            ("DELETE", "/students/{id}", self.delete_student, True),
+        ]:
+            regex = re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern) + "$")
+            self._routes.append((method, regex, handler, blocking))
+
+    # -------------------------
+    # HTTP plumbing
+    # -------------------------
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+
+                status, payload = await self.dispatch(method, target, body, headers)
+                etag = ""
+                if isinstance(payload, Versioned):
+                    etag = f'ETag: "{payload.version}"\r\n'
+                    payload = payload.payload
+                data = json.dumps(payload, default=_to_json).encode("utf-8")
+                keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close")
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"{etag}"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body, headers=None):
+        url = urlsplit(target)
+        allowed = False
+        for route_method, regex, handler, blocking in self._routes:
+            match = regex.match(url.path)
+            if not match:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            try:
+                params = dict(parse_qsl(url.query))
+                if headers and headers.get("if-match", "*") != "*":
+                    # The ETag handed out with a student record is its version.
+                    params.setdefault("expected_version", headers["if-match"].strip('W/"'))
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise HTTPError(400, "request body must be a JSON object")
+                call = lambda: handler(params=params, body=data, **match.groupdict())
+                if blocking:
+                    result = await asyncio.get_running_loop().run_in_executor(self.executor, call)
+                else:
+                    result = call()
+                return (201 if method == "POST" else 200), result
+            except HTTPError as e:
+                return e.status, {"error": str(e)}
+            except (StudentExistsError, StudentConflictError) as e:
+                return 409, {"error": str(e)}
+            except KeyError as e:
+                return 400, {"error": f"missing field {e}"}
+            except json.JSONDecodeError:
+                return 400, {"error": "request body is not valid JSON"}
+            except Exception as e:
+                # Managers raise plain exceptions; "not found" ones become 404s.
+                return (404 if "not found" in str(e).lower() else 400), {"error": str(e)}
+        if allowed:
+            return 405, {"error": f"{method} not allowed on {url.path}"}
+        return 404, {"error": f"no route for {url.path}"}
+
+    # -------------------------
+    # Classrooms & reservations
+    # -------------------------
+    def list_classrooms(self, params, body):
+        return self.scheduler.classrooms
+
+    def add_classroom(self, params, body):
+        room = Classroom(id=body["id"], capacity=int(body["capacity"]), location=body.get("location"))
+        self.scheduler.add_classroom(room)
+        return room
+
+    def get_maintenance(self, params, body, id):
+        return self.scheduler.get_tickets(id, params.get("status", "open"))
+
+    def report_maintenance(self, params, body, id):
+        window = [_parse_time(body[name], name) for name in ("start", "end") if name in body]
+        try:
+            return self.scheduler.open_ticket(id, body["description"], *window, bump=bool(body.get("bump")))
+        except ValueError as e:
+            if "in this window" in str(e):
+                raise HTTPError(409, str(e))
+            raise
+
+    def close_rooms(self, params, body):
+        tickets, errors = self.scheduler.close_rooms(
+            _parse_time(body["start"], "start"), _parse_time(body["end"], "end"), body["description"],
+            location=body.get("location"), classroom_ids=body.get("classroom_ids"),
+            bump=bool(body.get("bump")))
+        return {"tickets": tickets, "errors": errors}
+
+    def resolve_ticket(self, params, body, id):
+        return {"message": self.scheduler.resolve_ticket(int(id))}
+
+    def blocked_rooms(self, params, body):
+        return sorted(self.scheduler.blocked_rooms())
+
+    def resolve_maintenance(self, params, body, id):
+        return {"message": self.scheduler.resolve_maintenance(id)}
+
+    def list_reservations(self, params, body, id):
+        return self.scheduler.get_reservations(id)
+
+    def list_recurring(self, params, body, id):
+        return self.scheduler.get_recurring(id)
+
+    def get_schedule(self, params, body, id):
+        return self.scheduler.get_schedule(
+            id, _parse_time(params["start"], "start"), _parse_time(params["end"], "end"))
+
+    def reserve(self, params, body):
+        if body.get("equipment") or body.get("categories"):
+            # Room and equipment are booked together, all or nothing.
+            message = self.scheduler.reserve_with_equipment(
+                *self._booking(body), equipment_ids=body.get("equipment", []),
+                categories=body.get("categories", []))
+            if not message.startswith("Reservation"):
+                raise HTTPError(409, message)
+            return {"message": message}
+        message = self.scheduler.reserve_classroom(*self._booking(body))
+        if not message.startswith("Reservation"):
+            raise HTTPError(409, message)
+        return self.scheduler.get_reservation(int(message.split()[1]))
+
+    def reserve_many(self, params, body):
+        return self.scheduler.reserve_many(
+            [self._booking(item) for item in body["requests"]], atomic=bool(body.get("atomic")))
+
+    def reserve_recurring(self, params, body):
+        classroom_id, start, end, reserved_by = self._booking(body)
+        message = self.scheduler.reserve_recurring(
+            classroom_id, start, end, reserved_by,
+            until=_parse_date(body["until"], "until"),
+            frequency=body.get("frequency", "weekly"),
+            exceptions=[_parse_date(day, "exceptions") for day in body.get("exceptions", [])])
+        if not message.startswith("Recurring reservation"):
+            raise HTTPError(409, message)
+        return {"message": message}
+
+    def skip_occurrence(self, params, body, id):
+        return {"message": self.scheduler.skip_occurrence(int(id), _parse_date(body["date"], "date"))}
+
+    def get_reservation(self, params, body, id):
+        res = self.scheduler.get_reservation(int(id))
+        if res is None:
+            raise HTTPError(404, f"Reservation {id} not found")
+        return res
+
+    def reschedule(self, params, body, id):
+        message = self.scheduler.reschedule(
+            int(id), _parse_time(body["start"], "start"), _parse_time(body["end"], "end"))
+        if "moved to" not in message:
+            raise HTTPError(409, message)
+        return {"message": message}
+
+    def cancel_reservation(self, params, body, id):
+        return {"message": self.scheduler.cancel_reservation(int(id))}
+
+    def compact_reservations(self, params, body):
+        now = _parse_time(body["now"], "now") if body and "now" in body else None
+        return {"archived": self.scheduler.compact(now)}
+
+    @staticmethod
+    def _booking(item):
+        return (item["classroom_id"], _parse_time(item["start"], "start"),
+                _parse_time(item["end"], "end"), item["reserved_by"])
+
+    def check_availability(self, params, body):
+        return {"available": self.scheduler.check_availability(
+            params["classroom_id"], _parse_time(params["start"], "start"), _parse_time(params["end"], "end"))}
+
+    def find_free_rooms(self, params, body):
+        if "equipment_category" in params:
+            return self.scheduler.find_rooms_with_equipment(
+                _parse_time(params["start"], "start"), _parse_time(params["end"], "end"),
+                params["equipment_category"], capacity=int(params.get("capacity", 0)),
+                location=params.get("location"))
+        duration = params.get("duration_minutes")
+        return self.scheduler.find_free_rooms(
+            _parse_time(params["start"], "start"), _parse_time(params["end"], "end"),
+            capacity=int(params.get("capacity", 0)),
+            location=params.get("location"),
+            duration=timedelta(minutes=int(duration)) if duration else None,
+            limit=int(params["limit"]) if "limit" in params else None)
+
+    def free_equipment(self, params, body):
+        return self.scheduler.free_equipment(
+            _parse_time(params["start"], "start"), _parse_time(params["end"], "end"), params.get("category"))
+
+    def reserve_equipment(self, params, body):
+        message = self.scheduler.reserve_equipment(
+            body["equipment_id"], _parse_time(body["start"], "start"), _parse_time(body["end"], "end"),
+            body["reserved_by"])
+        if not message.startswith("Equipment booking"):
+            raise HTTPError(409, message)
+        return {"message": message}
+
+    def cancel_equipment_booking(self, params, body, id):
+        return {"message": self.scheduler.cancel_equipment_booking(int(id))}
+
+    def equipment_bookings(self, params, body, id):
+        return self.scheduler.get_equipment_bookings(id)
+
+    # -------------------------
+    # Equipment, licenses, people
+    # -------------------------
+    def list_assets(self, params, body):
+        return self.assets.track(params.get("pool"), params.get("category"),
+                                 _parse_flag(params, "allocated"), params.get("allocated_to"))
+
+    def asset_summary(self, params, body):
+        return self.assets.summary()
+
+    def asset_history(self, params, body, id):
+        self.assets.get(id)
+        return [{name: getattr(record, name) for name in AllocationRecord.__slots__}
+                for record in self.assets.history(id)]
+
+    def list_equipment(self, params, body):
+        return self.eq_manager.track_equipment(params.get("category"), _parse_flag(params, "allocated"),
+                                               params.get("assigned_to"))
+
+    def add_equipment(self, params, body):
+        self.eq_manager.add_equipment(Equipment(body["equipment_id"], body["name"], body["category"]))
+        return {"equipment_id": body["equipment_id"]}
+
+    def allocate_equipment(self, params, body, id):
+        self.eq_manager.allocate_equipment(id, body["assigned_to"])
+        return {"equipment_id": id, "allocated_to": body["assigned_to"]}
+
+    def release_equipment(self, params, body, id):
+        self.eq_manager.release_equipment(id)
+        return {"equipment_id": id}
+
+    def list_lab_equipment(self, params, body):
+        return self.lab_eq_manager.track_lab_equipment(params.get("category"), _parse_flag(params, "allocated"),
+                                                       params.get("allocated_to"))
+
+    def add_lab_equipment(self, params, body):
+        self.lab_eq_manager.add_lab_equipment(Equipment(body["equipment_id"], body["name"], body["category"]))
+        return {"equipment_id": body["equipment_id"]}
+
+    def allocate_lab_equipment(self, params, body, id):
+        self.lab_eq_manager.allocate_lab_equipment(id, body["allocated_to"])
+        return {"equipment_id": id, "allocated_to": body["allocated_to"]}
+
+    def release_lab_equipment(self, params, body, id):
+        self.lab_eq_manager.release_lab_equipment(id)
+        return {"equipment_id": id}
+
+    def list_licenses(self, params, body):
+        return self.license_manager.track_licenses()
+
+    def add_license(self, params, body):
+        self.license_manager.add_license(
+            SoftwareLicense(body["license_id"], body["name"], int(body["total_seats"])))
+        return {"license_id": body["license_id"]}
+
+    def allocate_license(self, params, body, id):
+        self.license_manager.allocate(id)
+        return self.license_manager.track_licenses()[id]
+
+    def release_license(self, params, body, id):
+        self.license_manager.release(id)
+        return self.license_manager.track_licenses()[id]
+
+    def list_people(self, params, body):
+        return self.person_manager.track_people()
+
+    def assign_professor(self, params, body):
+        self.person_manager.assign_professor(body["professor_id"], body["department"])
+        return {"professor_id": body["professor_id"], "department": body["department"]}
+
+    def move_professor(self, params, body, id):
+        self.person_manager.move_professor(id, body["department"])
+        return {"professor_id": id, "department": body["department"]}
+
+    def assign_student(self, params, body):
+        self.person_manager.assign_student(body["student_id"], body["department"])
+        return {"student_id": body["student_id"], "department": body["department"]}
+
+    # -------------------------
+    # Student records
+    # -------------------------
+    def list_students(self, params, body):
+        """One page of students; pass the returned next_cursor to get the next."""
+        pages = self.student_manager.iter_students(
+            batch_size=int(params.get("limit", 100)), cursor=params.get("cursor"))
+        page = next(pages, [])
+        return {"students": page,
+                "next_cursor": page[-1]["student_id"] if page else None}
+
+    def find_students(self, params, body):
+        return self.student_manager.find_students(**params)
+
+    def add_student(self, params, body):
+        errors = self.student_manager.validate_student(body)
+        if errors:
+            raise HTTPError(400, "; ".join(errors))
+        self.student_manager.add_student(body)
+        return self.get_student(params, {}, str(body["student_id"]).strip())
+
+    def get_student(self, params, body, id):
+        student, version = self.student_manager.get_student_version(id)
+        if student is None:
+            raise HTTPError(404, f"Student {id} not found")
+        return Versioned(student, version)
+
+    def edit_student(self, params, body, id):
+        expected = body.get("expected_version", params.get("expected_version"))
+        if not self.student_manager.edit_student(id, body["updates"], expected):
+            raise HTTPError(404, f"Student {id} not found")
+        return self.get_student(params, {}, id)
+
+    def delete_student(self, params, body, id):
+        if not self.student_manager.delete_student(id, params.get("expected_version")):
+            raise HTTPError(404, f"Student {id} not found")
+        return {"deleted": id}
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.scheduler.flush()
+        self.assets.close()
+
+
+async def serve(host="127.0.0.1", port=8080, data_dir=".", ready=None):
+    service = UniversityService(data_dir)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="University management HTTP/JSON service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", default=".")
+    args = parser.parse_args()
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(args.host, args.port, args.data_dir))
+    except KeyboardInterrupt:
+        pass
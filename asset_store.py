@@ -0,0 +1,114 @@
+# asset_store.py
+# Persistence backends for equipment_management.AssetRegistry.
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from equipment_management import AllocationRecord, Equipment
+
+
+class AssetStore(ABC):
+    """Interface an AssetRegistry persistence backend has to implement."""
+
+    @abstractmethod
+    def load_assets(self) -> List[Tuple[str, Equipment]]:
+        """Every stored item with the name of its pool."""
+
+    @abstractmethod
+    def save_asset(self, pool: str, equipment: Equipment, record: Optional[AllocationRecord] = None):
+        """Store an item's current state, plus a history record if given,
+        in one transaction."""
+
+    @abstractmethod
+    def load_history(self, equipment_id: Optional[str] = None,
+                     pool: Optional[str] = None) -> List[AllocationRecord]:
+        ...
+
+    def close(self):
+        pass
+
+
+class SQLiteAssetStore(AssetStore):
+    """Assets and their allocation history in a local SQLite database.
+
+    One connection is shared by all threads, serialised by an internal lock.
+    Times are the naive local datetimes Equipment uses, stored as ISO text.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS assets (
+            id TEXT PRIMARY KEY,
+            pool TEXT NOT NULL,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            allocated_to TEXT,
+            allocation_date TEXT
+        );
+        CREATE TABLE IF NOT EXISTS allocation_history (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            equipment_id TEXT NOT NULL,
+            pool TEXT NOT NULL,
+            action TEXT NOT NULL,
+            allocated_to TEXT,
+            at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_history_item ON allocation_history(equipment_id);
+    """
+
+    def __init__(self, path: str = "assets.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def load_assets(self) -> List[Tuple[str, Equipment]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, pool, name, category, allocated_to, allocation_date FROM assets ORDER BY rowid")
+            found = []
+            for equipment_id, pool, name, category, allocated_to, allocation_date in rows:
+                equipment = Equipment(equipment_id, name, category)
+                if allocated_to is not None:
+                    equipment.is_allocated = True
+                    equipment.allocated_to = allocated_to
+                    equipment.allocation_date = datetime.fromisoformat(allocation_date)
+                found.append((pool, equipment))
+            return found
+
+    def save_asset(self, pool: str, equipment: Equipment, record: Optional[AllocationRecord] = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO assets (id, pool, name, category, allocated_to, allocation_date) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                "pool = excluded.pool, name = excluded.name, category = excluded.category, "
+                "allocated_to = excluded.allocated_to, allocation_date = excluded.allocation_date",
+                (equipment.equipment_id, pool, equipment.name, equipment.category,
+                 equipment.allocated_to if equipment.is_allocated else None,
+                 equipment.allocation_date.isoformat() if equipment.allocation_date else None))
+            if record is not None:
+                self._conn.execute(
+                    "INSERT INTO allocation_history (equipment_id, pool, action, allocated_to, at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (record.equipment_id, record.pool, record.action, record.allocated_to,
+                     record.at.isoformat()))
+
+    def load_history(self, equipment_id: Optional[str] = None,
+                     pool: Optional[str] = None) -> List[AllocationRecord]:
+        query = "SELECT equipment_id, pool, action, allocated_to, at FROM allocation_history WHERE 1 = 1"
+        params = []
+        if equipment_id is not None:
+            query += " AND equipment_id = ?"
+            params.append(equipment_id)
+        if pool is not None:
+            query += " AND pool = ?"
+            params.append(pool)
+        with self._lock:
+            return [AllocationRecord(eid, p, action, allocated_to, datetime.fromisoformat(at))
+                    for eid, p, action, allocated_to, at in self._conn.execute(query + " ORDER BY seq", params)]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,561 @@
+# benchmarks.py
+# Small timing harness for the management modules.
+# Usage: python benchmarks.py [name ...]   (no name runs everything)
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from dataclasses import make_dataclass
+from datetime import datetime, timedelta
+
+from Classroom_Manager import Scheduler, Classroom, Reservation, ReservationColumns, to_epoch
+from equipment_management import AssetRegistry, Equipment, EquipmentManager, LaboratoryEquipmentManager
+from Student_Manager import StudentManager, SQLiteStudentManager
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+
+# ---------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------
+
+def _make_scheduler(rooms):
+    scheduler = Scheduler()
+    for i in range(rooms):
+        scheduler.add_classroom(Classroom(id=f"R{i:04d}", capacity=30))
+    return scheduler
+
+
+def _booking_requests(n, rooms, seed=0):
+    """n one-hour bookings spread over `rooms` rooms, in shuffled order."""
+    base = datetime(2025, 9, 1, 8)
+    per_room = n // rooms + 1
+    slots = [(f"R{i % rooms:04d}", base + timedelta(hours=2 * (i // rooms)))
+             for i in range(rooms * per_room)][:n]
+    random.Random(seed).shuffle(slots)
+    return [(room, start, start + timedelta(hours=1)) for room, start in slots]
+
+
+def bench_bulk_booking(sizes=(25_000, 50_000, 100_000), rooms=200):
+    print("Bulk booking via reserve_classroom")
+    for n in sizes:
+        scheduler = _make_scheduler(rooms)
+        requests = _booking_requests(n, rooms)
+
+        def run():
+            for room, start, end in requests:
+                scheduler.reserve_classroom(room, start, end, "bench")
+
+        elapsed, _ = _timed(run)
+        assert len(scheduler.reservations) == n
+        print(f"  {n:>8} bookings: {elapsed:7.3f}s  ({elapsed / n * 1e6:6.2f} us/booking)")
+
+
+def bench_reserve_many(sizes=(25_000, 50_000, 100_000), rooms=200):
+    print("Bulk booking via reserve_many")
+    for n in sizes:
+        scheduler = _make_scheduler(rooms)
+        requests = [(room, start, end, "bench") for room, start, end in _booking_requests(n, rooms)]
+        elapsed, results = _timed(scheduler.reserve_many, requests)
+        assert all(r.accepted for r in results)
+        print(f"  {n:>8} bookings: {elapsed:7.3f}s  ({elapsed / n * 1e6:6.2f} us/booking)")
+
+
+def _assert_consistent(scheduler):
+    """No two reservations of a room overlap and every id is unique."""
+    reservations = scheduler.reservations
+    assert len({r.id for r in reservations}) == len(reservations), "duplicate reservation ids"
+    by_room = {}
+    for r in reservations:
+        by_room.setdefault(r.classroom_id, []).append(r)
+    for room_id, items in by_room.items():
+        items.sort(key=lambda r: r.start_us)
+        for a, b in zip(items, items[1:]):
+            assert a.end_us <= b.start_us, f"overlap in {room_id}: {a} / {b}"
+
+
+def stress_scheduler(threads=8, rooms=4, attempts=5_000, slots=200, seed=0):
+    """Hammer one Scheduler from many threads with colliding bookings."""
+    scheduler = _make_scheduler(rooms)
+    base = datetime(2025, 9, 1, 8)
+    barrier = threading.Barrier(threads)
+    accepted = [0] * threads
+
+    def worker(n):
+        rng = random.Random(seed + n)
+        barrier.wait()
+        for _ in range(attempts):
+            room = f"R{rng.randrange(rooms):04d}"
+            start = base + timedelta(minutes=30 * rng.randrange(slots))
+            end = start + timedelta(minutes=30 * rng.randint(1, 4))
+            if rng.random() < 0.1:
+                results = scheduler.reserve_many([(room, start, end, f"t{n}")] * 2)
+                accepted[n] += sum(r.accepted for r in results)
+            elif scheduler.reserve_classroom(room, start, end, f"t{n}").startswith("Reservation"):
+                accepted[n] += 1
+
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    try:
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        elapsed, _ = _timed(lambda: [w.start() for w in workers] and [w.join() for w in workers])
+    finally:
+        sys.setswitchinterval(old_interval)
+
+    _assert_consistent(scheduler)
+    assert sum(accepted) == len(scheduler.reservations)
+    print(f"Scheduler stress: {threads} threads x {attempts} attempts on {rooms} rooms "
+          f"in {elapsed:.2f}s, {sum(accepted)} accepted, no overlaps")
+
+
+def bench_recurring_term(sections=300, rooms=60, weeks=15):
+    """A term of weekly lectures, once as recurring rules and once expanded."""
+    first_monday = datetime(2025, 9, 1)
+    until = (first_monday + timedelta(weeks=weeks, days=-1)).date()
+    lectures = []
+    for i in range(sections):
+        for day in range(5):
+            start = first_monday + timedelta(days=day, hours=8 + 2 * ((i // rooms) % 5))
+            lectures.append((f"R{i % rooms:04d}", start, start + timedelta(minutes=90), f"S{i:04d}"))
+
+    print(f"Recurring term: {len(lectures)} weekly lectures x {weeks} weeks")
+    for label in ("recurring rules", "one per occurrence"):
+        tracemalloc.start()
+        scheduler = _make_scheduler(rooms)
+        if label == "recurring rules":
+            def run():
+                for room, start, end, who in lectures:
+                    message = scheduler.reserve_recurring(room, start, end, who, until=until)
+                    assert message.startswith("Recurring"), message
+        else:
+            def run():
+                for room, start, end, who in lectures:
+                    for week in range(weeks):
+                        shift = timedelta(weeks=week)
+                        message = scheduler.reserve_classroom(room, start + shift, end + shift, who)
+                        assert message.startswith("Reservation"), message
+        elapsed, _ = _timed(run)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        records = len(scheduler.get_recurring()) + len(scheduler.reservations)
+        probe = first_monday + timedelta(weeks=weeks // 2, hours=8)
+        lookups, _ = _timed(lambda: [scheduler.check_availability(f"R{i:04d}", probe, probe + timedelta(hours=1))
+                                     for i in range(rooms) for _ in range(100)])
+        print(f"  {label:>18}: {records:>7} records  {memory / 2**20:7.1f} MiB  "
+              f"book {elapsed:6.3f}s  check {lookups / (rooms * 100) * 1e6:6.2f} us")
+
+
+def bench_reservation_memory(n=200_000, rooms=200):
+    """Bytes per reservation for a dict-backed dataclass holding datetimes,
+    the slotted epoch-based Reservation and the columnar ReservationColumns."""
+    # The old layout: per-instance __dict__ and two datetime objects.
+    DictReservation = make_dataclass("DictReservation", [
+        ("id", int), ("classroom_id", str), ("reserved_by", str), ("start", datetime), ("end", datetime)])
+    rows = [(i, room, start, end) for i, (room, start, end) in enumerate(_booking_requests(n, rooms))]
+    rows.sort(key=lambda row: row[2])
+
+    def measure(build):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        del kept
+        return used / n
+
+    def dict_objects():
+        return [DictReservation(i, room, f"user{i % 500}", start + timedelta(0), end + timedelta(0))
+                for i, room, start, end in rows]
+
+    def slotted_objects():
+        return [Reservation(i, room, f"user{i % 500}", to_epoch(start), to_epoch(end))
+                for i, room, start, end in rows]
+
+    def columns():
+        by_room = {}
+        for res in slotted_objects():
+            by_room.setdefault(res.classroom_id, []).append(res)
+        return [ReservationColumns(room, items) for room, items in by_room.items()]
+
+    print(f"Reservation memory ({n} bookings)")
+    for label, build in (("dataclass + __dict__", dict_objects),
+                         ("slotted Reservation", slotted_objects),
+                         ("ReservationColumns", columns)):
+        print(f"  {label:>20}: {measure(build):7.1f} bytes/reservation")
+
+
+def bench_occupancy(rooms=200, weeks=4, bookings=20_000):
+    """Occupancy-matrix analytics against per-slot check_availability loops."""
+    from occupancy import OccupancyMatrix, np
+    if np is None:
+        print("Occupancy matrix: NumPy not installed, skipped")
+        return
+
+    term_start = datetime(2025, 9, 1)
+    term_end = term_start + timedelta(weeks=weeks)
+    slot = timedelta(hours=1)
+    scheduler = _make_scheduler(rooms)
+    rng = random.Random(0)
+    scheduler.reserve_many([
+        (f"R{rng.randrange(rooms):04d}",
+         term_start + timedelta(minutes=30 * k), term_start + timedelta(minutes=30 * (k + rng.randint(1, 4))),
+         "bench")
+        for k in (rng.randrange(weeks * 7 * 48 - 4) for _ in range(bookings))])
+    slots = [term_start + i * slot for i in range(weeks * 7 * 24)]
+
+    elapsed_build, matrix = _timed(OccupancyMatrix, scheduler, term_start, term_end, slot)
+
+    def naive_utilisation():
+        return {room_id: sum(not scheduler.check_availability(room_id, t, t + slot) for t in slots) / len(slots)
+                for room_id in scheduler.classroom_ids()}
+
+    elapsed_naive, expected = _timed(naive_utilisation)
+    elapsed_vector, used = _timed(matrix.utilisation)
+    assert all(abs(used[room_id] - expected[room_id]) < 1e-9 for room_id in expected)
+
+    day = (term_start + timedelta(days=2, hours=9), term_start + timedelta(days=2, hours=17))
+    window = [t for t in slots if day[0] <= t < day[1]]
+
+    def naive_free():
+        return [room_id for room_id in scheduler.classroom_ids()
+                if all(scheduler.check_availability(room_id, t, t + slot) for t in window)]
+
+    elapsed_naive_free, expected_free = _timed(naive_free)
+    elapsed_free, free = _timed(matrix.free_rooms, *day)
+    assert free == expected_free
+
+    # Incremental updates: cancelling and rebooking keeps the matrix exact.
+    for res in rng.sample(scheduler.reservations, 100):
+        scheduler.cancel_reservation(res.id)
+    assert matrix.utilisation() == naive_utilisation()
+
+    print(f"Occupancy matrix: {rooms} rooms x {len(slots)} hourly slots, {len(scheduler.reservations)} bookings")
+    print(f"  build matrix            {elapsed_build:8.3f}s")
+    print(f"  utilisation   naive     {elapsed_naive:8.3f}s   vectorised {elapsed_vector:8.4f}s")
+    print(f"  free all day  naive     {elapsed_naive_free:8.3f}s   vectorised {elapsed_free:8.4f}s")
+    print(f"  peak hours              {matrix.peak_hours()}")
+
+
+# ---------------------------------------------------------
+# Equipment
+# ---------------------------------------------------------
+
+def bench_asset_registry(n=100_000, rooms=500, queries=1_000):
+    """Indexed registry lookups against full scans of both pools."""
+    registry = AssetRegistry()
+    general, lab = EquipmentManager(registry), LaboratoryEquipmentManager(registry)
+    rng = random.Random(0)
+    categories = ["AV", "IT", "Stationery", "Biology", "Chemistry"]
+    for i in range(n):
+        equipment = Equipment(f"A{i:06d}", "bench", rng.choice(categories))
+        if i % 2:
+            lab.add_lab_equipment(equipment)
+        else:
+            general.add_equipment(equipment)
+    for i in range(0, n, 3):
+        registry.allocate(f"A{i:06d}", f"R{rng.randrange(rooms):04d}")
+
+    def scan_dashboard():
+        return (sum(1 for eq in general.equipment_list.values() if eq.is_allocated),
+                sum(1 for eq in lab.lab_equipment.values() if eq.is_allocated))
+
+    def scan_held_by(room_id):
+        return sorted(eq.equipment_id for pool in (general.equipment_list, lab.lab_equipment)
+                      for eq in pool.values() if eq.allocated_to == room_id)
+
+    summary = registry.summary()
+    assert scan_dashboard() == (summary["general"]["allocated"], summary["lab"]["allocated"])
+    assert scan_held_by("R0007") == [eq.equipment_id for eq in registry.find(allocated_to="R0007")]
+    elapsed_scan, _ = _timed(lambda: [scan_dashboard() for _ in range(10)])
+    elapsed_summary, _ = _timed(lambda: [registry.summary() for _ in range(queries)])
+    elapsed_scan_held, _ = _timed(lambda: [scan_held_by(f"R{i:04d}") for i in range(10)])
+    elapsed_held, _ = _timed(lambda: [registry.find(allocated_to=f"R{i % rooms:04d}") for i in range(queries)])
+    elapsed_free, free_av = _timed(registry.find, None, "AV", False)
+
+    print(f"Asset registry: {n} items in 2 pools, {registry.count(allocated=True)} allocated")
+    print(f"  dashboard     scan {elapsed_scan / 10 * 1e3:8.2f} ms   indexed {elapsed_summary / queries * 1e6:8.2f} us")
+    print(f"  held by room  scan {elapsed_scan_held / 10 * 1e3:8.2f} ms   indexed {elapsed_held / queries * 1e6:8.2f} us")
+    print(f"  free AV gear  {len(free_av)} items in {elapsed_free * 1e3:.2f} ms")
+
+
+def bench_equipment_join(rooms=200, projectors=150, bookings=5_000, days=5):
+    """Rooms with a free projector: index join against nested loops."""
+    registry = AssetRegistry()
+    scheduler = Scheduler(assets=registry)
+    for i in range(rooms):
+        scheduler.add_classroom(Classroom(f"R{i:04d}", 20 + i % 80, "Main"))
+    for i in range(projectors):
+        registry.add("general", Equipment(f"P{i:04d}", "Projector", "AV"))
+        registry.add("general", Equipment(f"W{i:04d}", "Whiteboard", "Stationery"))
+        registry.allocate(f"P{i:04d}", f"R{i:04d}")
+    start = datetime(2025, 9, 1, 8)
+    rng = random.Random(0)
+
+    def book():
+        accepted = 0
+        for _ in range(bookings):
+            t = start + timedelta(days=rng.randrange(days), hours=rng.randrange(10))
+            room_id = f"R{rng.randrange(rooms):04d}"
+            message = scheduler.reserve_with_equipment(room_id, t, t + timedelta(hours=1), "bench",
+                                                       categories=["AV"] if rng.random() < 0.5 else ())
+            accepted += message.startswith("Reservation")
+        return accepted
+
+    elapsed_book, accepted = _timed(book)
+    window = (start + timedelta(hours=2), start + timedelta(hours=3))
+
+    def nested_loops():
+        found = {}
+        for room_id in scheduler.classroom_ids():
+            if not scheduler.check_availability(room_id, *window):
+                continue
+            free = [eq.equipment_id for eq in registry.assets.values()
+                    if eq.category == "AV" and eq.allocated_to == room_id
+                    and not any(b.start < window[1] and b.end > window[0]
+                                for b in scheduler.get_equipment_bookings(eq.equipment_id))]
+            if free:
+                found[room_id] = free
+        return found
+
+    elapsed_naive, expected = _timed(nested_loops)
+    elapsed_join, found = _timed(scheduler.find_rooms_with_equipment, *window, "AV")
+    assert found == expected
+
+    print(f"Equipment join: {rooms} rooms, {projectors} projectors, {accepted} of {bookings} bookings accepted "
+          f"in {elapsed_book:.2f}s")
+    print(f"  rooms with a free projector  nested {elapsed_naive * 1e3:8.2f} ms   "
+          f"joined {elapsed_join * 1e3:8.2f} ms   ({len(found)} rooms)")
+
+
+# ---------------------------------------------------------
+# Student records
+# ---------------------------------------------------------
+
+def _student(i):
+    return {
+        "student_id": f"S{i:06d}",
+        "first_name": f"First{i}",
+        "last_name": f"Last{i}",
+        "department": ("Computer Engineering", "Mechanical Engineering", "Physics")[i % 3],
+        "email": f"s{i}@example.edu",
+        "enrollment_year": 2018 + i % 6,
+        "gpa": round(2 + (i % 20) / 10, 1),
+        "status": "enrolled" if i % 7 else "graduated",
+    }
+
+
+def bench_student_backends(sizes=(1_000, 10_000, 100_000), lookups=1_000):
+    workdir = tempfile.mkdtemp(prefix="student_bench_")
+    try:
+        print("Student backends: list_students / get_student")
+        for n in sizes:
+            folder = os.path.join(workdir, f"files_{n}")
+            files = StudentManager(folder)
+            sqlite = SQLiteStudentManager(os.path.join(workdir, f"students_{n}.db"))
+            for i in range(n):
+                files.add_student(_student(i))
+            sqlite.migrate_from_folder(folder)
+            ids = [f"S{random.randrange(n):06d}" for _ in range(lookups)]
+
+            for label, manager in (("files ", files), ("sqlite", sqlite)):
+                # Measure reads from disk, not records add_student or the
+                # listing just left in the LRU cache.
+                manager.clear_cache()
+                list_time, listed = _timed(manager.list_students)
+                assert len(listed) == n
+                manager.clear_cache()
+                get_time, _ = _timed(lambda: [manager.get_student(sid) for sid in ids])
+                print(f"  {n:>7} {label}: list {list_time * 1e3:9.1f} ms   "
+                      f"get {get_time / lookups * 1e6:7.1f} us/lookup")
+            sqlite.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_student_import_export(n=20_000):
+    workdir = tempfile.mkdtemp(prefix="student_bench_")
+    try:
+        print(f"Student import/export ({n} records)")
+        source = StudentManager(os.path.join(workdir, "source"))
+        source.add_students(_student(i) for i in range(n))
+        for file_format in ("csv", "jsonl"):
+            path = os.path.join(workdir, f"students.{file_format}")
+            exported = source.export_students(path)
+            target = StudentManager(os.path.join(workdir, f"target_{file_format}"))
+            imported = target.import_students(path)
+            assert imported["imported"] == n and not imported["errors"]
+            print(f"  {file_format:>5}: export {exported['records_per_sec']:9.0f} rec/s   "
+                  f"import {imported['records_per_sec']:9.0f} rec/s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# Runs in a fresh interpreter inside the benchmark's working directory.
+_STARTUP_SCRIPT = '''
+import time
+t0 = time.perf_counter()
+import Student_Manager
+t1 = time.perf_counter()
+print(f"import Student_Manager {(t1 - t0) * 1e3:8.1f} ms")
+try:
+    import tkinter as tk
+    import GUI
+    t2 = time.perf_counter()
+    print(f"import GUI             {(t2 - t1) * 1e3:8.1f} ms")
+    root = tk.Tk()
+    app = GUI.UniversityManagementGUI(root)
+    root.update()
+    t3 = time.perf_counter()
+    print(f"first render           {(t3 - t2) * 1e3:8.1f} ms")
+    root.destroy()
+except Exception as e:  # no Tk installed, or no display to open
+    print(f"GUI skipped: {e}")
+'''
+
+
+def bench_startup(n=10_000):
+    workdir = tempfile.mkdtemp(prefix="startup_bench_")
+    try:
+        StudentManager(os.path.join(workdir, "students"), fsync=False).add_students(
+            _student(i) for i in range(n))
+        print(f"Startup against an existing {n}-student store")
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT], cwd=workdir, env=env,
+                             capture_output=True, text=True)
+        for line in (out.stdout + out.stderr).splitlines():
+            print(f"  {line}")
+        assert StudentManager(os.path.join(workdir, "students")).count_students() >= n
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ---------------------------------------------------------
+# HTTP service
+# ---------------------------------------------------------
+
+async def _http_request(reader, writer, method, target, body=b""):
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _http_client(port, n, rooms, students, latencies, rng):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    base = datetime(2025, 9, 1, 8)
+    try:
+        for _ in range(n):
+            room = f"R{rng.randrange(rooms):04d}"
+            start = base + timedelta(hours=rng.randrange(2_000))
+            end = start + timedelta(hours=1)
+            roll = rng.random()
+            if roll < 0.4:
+                method, body = "GET", b""
+                target = f"/availability?classroom_id={room}&start={start.isoformat()}&end={end.isoformat()}"
+            elif roll < 0.6:
+                method, target = "POST", "/reservations"
+                body = json.dumps({"classroom_id": room, "start": start.isoformat(),
+                                   "end": end.isoformat(), "reserved_by": "load"}).encode()
+            elif roll < 0.9:
+                method, target, body = "GET", f"/students/S{rng.randrange(students):06d}", b""
+            else:
+                method, target, body = "GET", "/equipment", b""
+
+            t0 = time.perf_counter()
+            status, _ = await _http_request(reader, writer, method, target, body)
+            latencies.append(time.perf_counter() - t0)
+            assert status < 500, status
+    finally:
+        writer.close()
+
+
+def bench_service_load(clients=32, requests_per_client=200, rooms=50, students=1_000):
+    import api_service
+
+    workdir = tempfile.mkdtemp(prefix="service_bench_")
+    StudentManager(os.path.join(workdir, "students"), fsync=False).add_students(
+        _student(i) for i in range(students))
+
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    port = []
+
+    async def run_server():
+        await api_service.serve("127.0.0.1", 0, workdir,
+                                ready=lambda p: (port.append(p), ready.set()))
+
+    server = loop.create_task(run_server())
+    thread = threading.Thread(target=lambda: loop.run_until_complete(asyncio.gather(server, return_exceptions=True)))
+    thread.start()
+    try:
+        ready.wait(10)
+        service_port = port[0]
+
+        async def load():
+            reader, writer = await asyncio.open_connection("127.0.0.1", service_port)
+            for i in range(rooms):
+                body = json.dumps({"id": f"R{i:04d}", "capacity": 30}).encode()
+                status, _ = await _http_request(reader, writer, "POST", "/classrooms", body)
+                assert status == 201, status
+            writer.close()
+
+            latencies = []
+            t0 = time.perf_counter()
+            await asyncio.gather(*(
+                _http_client(service_port, requests_per_client, rooms, students, latencies, random.Random(n))
+                for n in range(clients)))
+            return latencies, time.perf_counter() - t0
+
+        latencies, elapsed = asyncio.run(load())
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"HTTP service: {clients} clients x {requests_per_client} requests")
+        print(f"  {len(latencies) / elapsed:8.0f} req/s   p50 {p50 * 1e3:6.2f} ms   p99 {p99 * 1e3:6.2f} ms")
+    finally:
+        loop.call_soon_threadsafe(server.cancel)
+        thread.join()
+        loop.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+BENCHMARKS = {
+    "bulk_booking": bench_bulk_booking,
+    "reserve_many": bench_reserve_many,
+    "scheduler_stress": stress_scheduler,
+    "recurring_term": bench_recurring_term,
+    "reservation_memory": bench_reservation_memory,
+    "occupancy": bench_occupancy,
+    "asset_registry": bench_asset_registry,
+    "equipment_join": bench_equipment_join,
+    "student_backends": bench_student_backends,
+    "student_import_export": bench_student_import_export,
+    "startup": bench_startup,
+    "service_load": bench_service_load,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
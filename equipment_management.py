@@ -1,5 +1,6 @@
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, List, Optional, Set
 
 
 # ---------------------------------------------------------
@@ -7,6 +8,8 @@ from typing import List, Dict, Optional
 # ---------------------------------------------------------
 
 class Equipment:
+    __slots__ = ("equipment_id", "name", "category", "is_allocated", "allocated_to", "allocation_date")
+
     def __init__(self, equipment_id: str, name: str, category: str):
         self.equipment_id = equipment_id
         self.name = name
@@ -28,37 +31,310 @@ class Equipment:
         self.allocation_date = None
 
 
+class AssetPool:
+    """A kind of equipment kept in the registry, e.g. general or lab gear.
+
+    ``label`` names the kind in messages ("Lab equipment not found.").
+    """
+    __slots__ = ("name", "label")
+
+    def __init__(self, name: str, label: str):
+        self.name = name
+        self.label = label
+
+
+class AllocationRecord:
+    """One allocate or release of an asset, as kept in the history."""
+    __slots__ = ("equipment_id", "pool", "action", "allocated_to", "at")
+
+    def __init__(self, equipment_id: str, pool: str, action: str,
+                 allocated_to: Optional[str], at: datetime):
+        self.equipment_id = equipment_id
+        self.pool = pool
+        self.action = action
+        self.allocated_to = allocated_to
+        self.at = at
+
+
+GENERAL_POOL = AssetPool("general", "Equipment")
+LAB_POOL = AssetPool("lab", "Lab equipment")
+
+
+class AssetRegistry:
+    """Equipment of every pool behind one set of indexes.
+
+    Category, allocated/free and assignee indexes span all pools, so
+    cross-pool queries are one set intersection and counts are O(1).
+    Every allocate and release is appended to the allocation history.
+    ``store`` is an optional persistence backend (see asset_store.py);
+    assets are read from it up front and every change is written through.
+
+    Equipment ids are unique across pools. Items must be allocated and
+    released through the registry or its manager views; calling
+    Equipment.allocate() directly bypasses the indexes. Changes and
+    queries are serialised by an internal lock, so a Scheduler can read
+    the registry from other threads.
+    """
+
+    def __init__(self, store=None, pools: Iterable[AssetPool] = (GENERAL_POOL, LAB_POOL)):
+        self.assets: Dict[str, Equipment] = {}
+        self.pools: Dict[str, AssetPool] = {}
+        self._pool_items: Dict[str, Dict[str, Equipment]] = {}
+        self._pool_of: Dict[str, str] = {}
+        self._by_category: Dict[str, Set[str]] = {}
+        self._by_assignee: Dict[str, Set[str]] = {}
+        self._allocated: Set[str] = set()
+        self._free: Set[str] = set()
+        self._allocated_in: Dict[str, int] = {}
+        self._categories_in: Dict[str, Dict[str, int]] = {}
+        self._history: List[AllocationRecord] = []
+        self._store = store
+        self._lock = threading.RLock()
+        for pool in pools:
+            self.add_pool(pool)
+        if store is not None:
+            for pool_name, equipment in store.load_assets():
+                if pool_name not in self.pools:
+                    # A pool this program doesn't configure; keep its items reachable.
+                    self.add_pool(AssetPool(pool_name, "Equipment"))
+                self._index(pool_name, equipment)
+
+    def add_pool(self, pool: AssetPool):
+        if pool.name in self.pools:
+            raise Exception(f"Pool '{pool.name}' already exists.")
+        self.pools[pool.name] = pool
+        self._pool_items[pool.name] = {}
+        self._allocated_in[pool.name] = 0
+        self._categories_in[pool.name] = {}
+
+    def close(self):
+        if self._store is not None:
+            self._store.close()
+
+    def pool_items(self, pool: str) -> Dict[str, Equipment]:
+        """The pool's equipment by id, in insertion order (live, read-only use)."""
+        return self._pool_items[self._pool(pool).name]
+
+    # -------------------------
+    # Changes
+    # -------------------------
+    def add(self, pool: str, equipment: Equipment):
+        """Add equipment to a pool; an item with the same id in that pool is replaced."""
+        self._pool(pool)
+        with self._lock:
+            owner = self._pool_of.get(equipment.equipment_id)
+            if owner is not None and owner != pool:
+                raise Exception(f"Equipment id {equipment.equipment_id} is already used in pool '{owner}'.")
+            self._index(pool, equipment)
+            if self._store is not None:
+                self._store.save_asset(pool, equipment)
+
+    def allocate(self, equipment_id: str, allocated_to: str, pool: Optional[str] = None):
+        with self._lock:
+            equipment = self.get(equipment_id, pool)
+            equipment.allocate(allocated_to)
+            self._free.discard(equipment_id)
+            self._on_allocate(equipment)
+            self._record(equipment, "allocate", allocated_to)
+
+    def release(self, equipment_id: str, pool: Optional[str] = None):
+        with self._lock:
+            equipment = self.get(equipment_id, pool)
+            if not equipment.is_allocated:
+                return
+            allocated_to = equipment.allocated_to
+            self._on_release(equipment)
+            equipment.release()
+            self._free.add(equipment_id)
+            self._record(equipment, "release", allocated_to)
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def get(self, equipment_id: str, pool: Optional[str] = None) -> Equipment:
+        """The item with this id, optionally only if it belongs to ``pool``."""
+        owner = self._pool_of.get(equipment_id)
+        if owner is None or pool not in (None, owner):
+            label = self._pool(pool).label if pool is not None else "Equipment"
+            raise Exception(f"{label} not found.")
+        return self.assets[equipment_id]
+
+    def pool_of(self, equipment_id: str) -> Optional[str]:
+        return self._pool_of.get(equipment_id)
+
+    def find(self, pool: Optional[str] = None, category: Optional[str] = None,
+             allocated: Optional[bool] = None, allocated_to: Optional[str] = None) -> List[Equipment]:
+        """Items matching every given filter, ordered by id."""
+        candidates = []
+        if pool is not None:
+            candidates.append(self.pool_items(pool).keys())
+        if category is not None:
+            candidates.append(self._by_category.get(category, set()))
+        if allocated_to is not None:
+            candidates.append(self._by_assignee.get(allocated_to, set()))
+        if allocated is not None:
+            candidates.append(self._allocated if allocated else self._free)
+        with self._lock:
+            if not candidates:
+                return [self.assets[eid] for eid in sorted(self.assets)]
+            # Start from the smallest index and check the others by membership.
+            candidates.sort(key=len)
+            ids = set(candidates[0])
+            for other in candidates[1:]:
+                ids = {eid for eid in ids if eid in other}
+            return [self.assets[eid] for eid in sorted(ids)]
+
+    def track(self, pool: Optional[str] = None, category: Optional[str] = None,
+              allocated: Optional[bool] = None, allocated_to: Optional[str] = None) -> List[dict]:
+        """find() results as dicts, each with the name of its pool."""
+        return [dict(_describe(eq), pool=self._pool_of[eq.equipment_id])
+                for eq in self.find(pool, category, allocated, allocated_to)]
+
+    def count(self, pool: Optional[str] = None, allocated: Optional[bool] = None) -> int:
+        """Number of items, in one pool or all of them, optionally by allocation state."""
+        if pool is None:
+            total, used = len(self.assets), len(self._allocated)
+        else:
+            total, used = len(self.pool_items(pool)), self._allocated_in[pool]
+        if allocated is None:
+            return total
+        return used if allocated else total - used
+
+    def count_by_category(self, pool: Optional[str] = None) -> Dict[str, int]:
+        with self._lock:
+            if pool is None:
+                return {category: len(ids) for category, ids in self._by_category.items()}
+            return dict(self._categories_in[self._pool(pool).name])
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Total and allocated items per pool, from the counters alone."""
+        with self._lock:
+            return {name: {"total": len(items), "allocated": self._allocated_in[name]}
+                    for name, items in self._pool_items.items()}
+
+    def history(self, equipment_id: Optional[str] = None,
+                pool: Optional[str] = None) -> List[AllocationRecord]:
+        """Allocations and releases, oldest first."""
+        if self._store is not None:
+            return self._store.load_history(equipment_id, pool)
+        return [record for record in self._history
+                if equipment_id in (None, record.equipment_id) and pool in (None, record.pool)]
+
+    # -------------------------
+    # Helper
+    # -------------------------
+    def _pool(self, pool: str) -> AssetPool:
+        found = self.pools.get(pool)
+        if found is None:
+            raise Exception(f"Pool '{pool}' not found.")
+        return found
+
+    def _index(self, pool: str, equipment: Equipment):
+        old = self.assets.get(equipment.equipment_id)
+        if old is not None:
+            self._unindex(old)
+        self.assets[equipment.equipment_id] = equipment
+        self._pool_items[pool][equipment.equipment_id] = equipment
+        self._pool_of[equipment.equipment_id] = pool
+        self._by_category.setdefault(equipment.category, set()).add(equipment.equipment_id)
+        categories = self._categories_in[pool]
+        categories[equipment.category] = categories.get(equipment.category, 0) + 1
+        if equipment.is_allocated:
+            self._on_allocate(equipment)
+        else:
+            self._free.add(equipment.equipment_id)
+
+    def _unindex(self, equipment: Equipment):
+        self._discard(self._by_category, equipment.category, equipment.equipment_id)
+        categories = self._categories_in[self._pool_of[equipment.equipment_id]]
+        categories[equipment.category] -= 1
+        if not categories[equipment.category]:
+            del categories[equipment.category]
+        if equipment.is_allocated:
+            self._on_release(equipment)
+        self._free.discard(equipment.equipment_id)
+
+    def _on_allocate(self, equipment: Equipment):
+        self._allocated.add(equipment.equipment_id)
+        self._allocated_in[self._pool_of[equipment.equipment_id]] += 1
+        self._by_assignee.setdefault(equipment.allocated_to, set()).add(equipment.equipment_id)
+
+    def _on_release(self, equipment: Equipment):
+        self._allocated.discard(equipment.equipment_id)
+        self._allocated_in[self._pool_of[equipment.equipment_id]] -= 1
+        self._discard(self._by_assignee, equipment.allocated_to, equipment.equipment_id)
+
+    def _record(self, equipment: Equipment, action: str, allocated_to: Optional[str]):
+        pool = self._pool_of[equipment.equipment_id]
+        record = AllocationRecord(equipment.equipment_id, pool, action, allocated_to, datetime.now())
+        if self._store is not None:
+            self._store.save_asset(pool, equipment, record)
+        else:
+            self._history.append(record)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, equipment_id: str):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(equipment_id)
+            if not ids:
+                del index[key]
+
+
+def _describe(eq: Equipment, with_date: bool = True) -> dict:
+    info = {
+        "id": eq.equipment_id,
+        "name": eq.name,
+        "category": eq.category,
+        "allocated": eq.is_allocated,
+        "allocated_to": eq.allocated_to
+    }
+    if with_date:
+        info["allocation_date"] = eq.allocation_date
+    return info
+
+
 class EquipmentManager:
-    def __init__(self):
-        self.equipment_list: Dict[str, Equipment] = {}
+    """General equipment: a view of the "general" pool of an AssetRegistry.
+
+    Managers built without a registry get a private one.
+    """
+
+    def __init__(self, registry: Optional[AssetRegistry] = None):
+        self.registry = registry if registry is not None else AssetRegistry()
+        self.equipment_list: Dict[str, Equipment] = self.registry.pool_items(GENERAL_POOL.name)
 
     def add_equipment(self, equipment: Equipment):
-        self.equipment_list[equipment.equipment_id] = equipment
+        self.registry.add(GENERAL_POOL.name, equipment)
 
     def allocate_equipment(self, equipment_id: str, assigned_to: str):
-        equipment = self.equipment_list.get(equipment_id)
-        if not equipment:
-            raise Exception("Equipment not found.")
-        equipment.allocate(assigned_to)
+        self.registry.allocate(equipment_id, assigned_to, GENERAL_POOL.name)
 
     def release_equipment(self, equipment_id: str):
-        equipment = self.equipment_list.get(equipment_id)
-        if not equipment:
-            raise Exception("Equipment not found.")
-        equipment.release()
-
-    def track_equipment(self):
-        return [
-            {
-                "id": eq.equipment_id,
-                "name": eq.name,
-                "category": eq.category,
-                "allocated": eq.is_allocated,
-                "allocated_to": eq.allocated_to,
-                "allocation_date": eq.allocation_date
-            }
-            for eq in self.equipment_list.values()
-        ]
+        self.registry.release(equipment_id, GENERAL_POOL.name)
+
+    def find_equipment(self, category: Optional[str] = None, allocated: Optional[bool] = None,
+                       assigned_to: Optional[str] = None) -> List[Equipment]:
+        """e.g. find_equipment(assigned_to="R101") or find_equipment("AV", allocated=False)."""
+        return self.registry.find(GENERAL_POOL.name, category, allocated, assigned_to)
+
+    def equipment_ids(self) -> List[str]:
+        return list(self.equipment_list)
+
+    def allocated_count(self) -> int:
+        return self.registry.count(GENERAL_POOL.name, allocated=True)
+
+    def free_count(self) -> int:
+        return self.registry.count(GENERAL_POOL.name, allocated=False)
+
+    def count_by_category(self) -> Dict[str, int]:
+        return self.registry.count_by_category(GENERAL_POOL.name)
+
+    def track_equipment(self, category: Optional[str] = None, allocated: Optional[bool] = None,
+                        assigned_to: Optional[str] = None):
+        if category is None and allocated is None and assigned_to is None:
+            return [_describe(eq) for eq in self.equipment_list.values()]
+        return [_describe(eq) for eq in self.find_equipment(category, allocated, assigned_to)]
 
 
 # ---------------------------------------------------------
@@ -66,6 +342,8 @@ class EquipmentManager:
 # ---------------------------------------------------------
 
 class SoftwareLicense:
+    __slots__ = ("license_id", "name", "total_seats", "used_seats")
+
     def __init__(self, license_id: str, name: str, total_seats: int):
         self.license_id = license_id
         self.name = name
@@ -144,30 +422,40 @@ class PersonAllocationManager:
 # ---------------------------------------------------------
 
 class LaboratoryEquipmentManager:
-    def __init__(self):
-        self.lab_equipment: Dict[str, Equipment] = {}
+    """Lab equipment: a view of the "lab" pool of an AssetRegistry."""
+
+    def __init__(self, registry: Optional[AssetRegistry] = None):
+        self.registry = registry if registry is not None else AssetRegistry()
+        self.lab_equipment: Dict[str, Equipment] = self.registry.pool_items(LAB_POOL.name)
 
     def add_lab_equipment(self, equipment: Equipment):
-        self.lab_equipment[equipment.equipment_id] = equipment
+        self.registry.add(LAB_POOL.name, equipment)
 
     def allocate_lab_equipment(self, equipment_id: str, allocated_to: str):
-        if equipment_id not in self.lab_equipment:
-            raise Exception("Lab equipment not found.")
-        self.lab_equipment[equipment_id].allocate(allocated_to)
+        self.registry.allocate(equipment_id, allocated_to, LAB_POOL.name)
 
     def release_lab_equipment(self, equipment_id: str):
-        if equipment_id not in self.lab_equipment:
-            raise Exception("Lab equipment not found.")
-        self.lab_equipment[equipment_id].release()
-
-    def track_lab_equipment(self):
-        return [
-            {
-                "id": eq.equipment_id,
-                "name": eq.name,
-                "category": eq.category,
-                "allocated": eq.is_allocated,
-                "allocated_to": eq.allocated_to
-            }
-            for eq in self.lab_equipment.values()
-        ]
+        self.registry.release(equipment_id, LAB_POOL.name)
+
+    def find_lab_equipment(self, category: Optional[str] = None, allocated: Optional[bool] = None,
+                           allocated_to: Optional[str] = None) -> List[Equipment]:
+        return self.registry.find(LAB_POOL.name, category, allocated, allocated_to)
+
+    def lab_equipment_ids(self) -> List[str]:
+        return list(self.lab_equipment)
+
+    def allocated_count(self) -> int:
+        return self.registry.count(LAB_POOL.name, allocated=True)
+
+    def free_count(self) -> int:
+        return self.registry.count(LAB_POOL.name, allocated=False)
+
+    def count_by_category(self) -> Dict[str, int]:
+        return self.registry.count_by_category(LAB_POOL.name)
+
+    def track_lab_equipment(self, category: Optional[str] = None, allocated: Optional[bool] = None,
+                            allocated_to: Optional[str] = None):
+        if category is None and allocated is None and allocated_to is None:
+            return [_describe(eq, with_date=False) for eq in self.lab_equipment.values()]
+        return [_describe(eq, with_date=False)
+                for eq in self.find_lab_equipment(category, allocated, allocated_to)]
@@ -1,11 +1,13 @@
 # main_integration.py
 import os
+import sys
+import argparse
 from datetime import datetime, timedelta
 
 # Import all necessary components from the three files
 from Classroom_Manager import Scheduler, Classroom, Reservation
 from equipment_management import (
-    EquipmentManager, Equipment, 
+    AssetRegistry, EquipmentManager, Equipment, 
     LicenseManager, SoftwareLicense, 
     PersonAllocationManager, LaboratoryEquipmentManager
 )
@@ -20,10 +22,11 @@ def setup_and_demo_system():
     
     # Managers
     scheduler = Scheduler()
-    eq_manager = EquipmentManager()
+    assets = AssetRegistry()
+    eq_manager = EquipmentManager(assets)
     license_manager = LicenseManager()
     person_manager = PersonAllocationManager()
-    lab_eq_manager = LaboratoryEquipmentManager()
+    lab_eq_manager = LaboratoryEquipmentManager(assets)
     student_manager = StudentManager()
 
     # Add Classrooms
@@ -54,8 +57,8 @@ def setup_and_demo_system():
     person_manager.assign_student("S001", "Computer Engineering")
     print("Assigned Professor P001, P002 and Student S001.")
 
-    # Add Student Records
-    student_manager.add_student({
+    # Add Student Records (kept on disk, so only missing ones are added)
+    student_manager.seed([{
         "student_id": "001",
         "first_name": "Maria",
         "last_name": "Ibraheem", 
@@ -64,9 +67,7 @@ def setup_and_demo_system():
         "enrollment_year": 2019,
         "gpa": 2.2,
         "status": "enrolled"
-    })
-    
-    student_manager.add_student({
+    }, {
         "student_id": "002", 
         "first_name": "Mark",
         "last_name": "Magdy", 
@@ -75,15 +76,13 @@ def setup_and_demo_system():
         "enrollment_year": 2020,
         "gpa": 3.5,
         "status": "enrolled"
-    })
-    
-    student_manager.add_student({
+    }, {
         "student_id": "007", 
         "first_name": "James", 
         "last_name": "Bond", 
         "department": "Spy School", 
         "enrollment_year": 2021
-    })
+    }])
     print("Added student records to disk.")
     
     print("\n" + "="*50 + "\n")
@@ -179,6 +178,7 @@ def launch_comprehensive_gui():
         print("   • Real-time Dashboard")
         
         root.mainloop()
+        app.scheduler.flush()
         
     except ImportError as e:
         print(f"❌ Error: Could not import GUI module. Make sure GUI.py is in the same directory.")
@@ -219,7 +219,55 @@ def system_status_check():
     return all_ok
 
 
+def run_student_cli(argv):
+    """Command-line student import/export, e.g.
+
+        python main_integration.py import-students new_term.csv
+        python main_integration.py export-students backup.jsonl
+    """
+    parser = argparse.ArgumentParser(prog="main_integration.py")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    import_cmd = subcommands.add_parser("import-students", help="import students from CSV/JSON Lines")
+    import_cmd.add_argument("path")
+    import_cmd.add_argument("--format", choices=["csv", "jsonl"], help="defaults to the file extension")
+    import_cmd.add_argument("--folder", default="students")
+    import_cmd.add_argument("--chunk-size", type=int, default=1000)
+
+    export_cmd = subcommands.add_parser("export-students", help="export students to CSV/JSON Lines")
+    export_cmd.add_argument("path")
+    export_cmd.add_argument("--format", choices=["csv", "jsonl"], help="defaults to the file extension")
+    export_cmd.add_argument("--folder", default="students")
+    export_cmd.add_argument("--chunk-size", type=int, default=1000)
+
+    args = parser.parse_args(argv)
+    student_manager = StudentManager(args.folder)
+
+    try:
+        if args.command == "import-students":
+            report = student_manager.import_students(args.path, args.format, args.chunk_size)
+        else:
+            report = student_manager.export_students(args.path, args.format, chunk_size=args.chunk_size)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return 2
+
+    if args.command == "import-students":
+        for row, message in report["errors"]:
+            print(f"❌ Row {row}: {message}")
+        print(f"✅ Imported {report['imported']} students, {len(report['errors'])} rejected "
+              f"in {report['seconds']:.2f}s ({report['records_per_sec']:.0f} records/sec)")
+        return 1 if report["errors"] else 0
+
+    print(f"✅ Exported {report['exported']} students to {args.path} "
+          f"in {report['seconds']:.2f}s ({report['records_per_sec']:.0f} records/sec)")
+    return 0
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_student_cli(sys.argv[1:]))
+
     # Display welcome message
     print("=" * 70)
     print("           COMPREHENSIVE UNIVERSITY MANAGEMENT SYSTEM")
@@ -0,0 +1,180 @@
+# occupancy.py
+# Rooms x time-slot occupancy matrix for utilisation analytics (needs NumPy).
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # analytics are optional; the scheduler itself doesn't need NumPy
+    np = None
+
+from Classroom_Manager import Scheduler, from_epoch, to_epoch
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class OccupancyMatrix:
+    """Occupancy of every classroom in fixed-width time slots.
+
+    ``busy[r, s]`` counts the bookings and scheduled maintenance windows
+    of room ``room_ids[r]`` overlapping slot ``s``, which covers
+    ``[start + s * slot, start + (s + 1) * slot)``.
+    A slot counts as occupied even if a booking only covers part of it.
+    The matrix subscribes to the scheduler and follows bookings and
+    maintenance as they change; build it before other threads start
+    booking. Queries are vectorised reductions over the matrix.
+    """
+
+    def __init__(self, scheduler: Scheduler, start: datetime, end: datetime,
+                 slot: timedelta = timedelta(hours=1)):
+        if np is None:
+            raise ImportError("OccupancyMatrix needs NumPy (pip install numpy)")
+        self.scheduler = scheduler
+        self.slot = slot
+        self._t0 = to_epoch(start, scheduler.tz)
+        self._width = slot // _MICROSECOND
+        t1 = to_epoch(end, scheduler.tz)
+        if self._width <= 0 or t1 <= self._t0:
+            raise ValueError("Need a positive slot width and end after start.")
+        self.slots = -(-(t1 - self._t0) // self._width)
+        self._lock = threading.Lock()
+
+        self.room_ids: List[str] = [room.id for room in scheduler.classrooms]
+        self._rows: Dict[str, int] = {room_id: i for i, room_id in enumerate(self.room_ids)}
+        self.busy = np.zeros((len(self.room_ids), self.slots), dtype=np.int32)
+        self.maintenance = np.array([room.is_under_maintenance for room in scheduler.classrooms], dtype=bool)
+        # Local hour of day at the start of every slot, for hourly profiles.
+        self._slot_hours = np.array(
+            [from_epoch(self._t0 + i * self._width, scheduler.tz).hour for i in range(self.slots)],
+            dtype=np.intp)
+
+        rows, starts, ends = [], [], []
+        end_us = self._t0 + self.slots * self._width
+        window_end = from_epoch(end_us)
+        for row, room_id in enumerate(self.room_ids):
+            for res in scheduler.get_schedule(room_id, from_epoch(self._t0), window_end):
+                rows.append(row)
+                starts.append(res.start_us)
+                ends.append(res.end_us)
+        for ticket in scheduler.get_tickets():
+            if ticket.scheduled and ticket.start_us < end_us and ticket.end_us > self._t0:
+                rows.append(self._rows[ticket.classroom_id])
+                starts.append(ticket.start_us)
+                ends.append(ticket.end_us)
+        self._load(np.array(rows, dtype=np.intp), np.array(starts, dtype=np.int64),
+                   np.array(ends, dtype=np.int64))
+        scheduler.subscribe(self._on_change)
+
+    def close(self):
+        """Stop following the scheduler."""
+        self.scheduler.unsubscribe(self._on_change)
+
+    # -------------------------
+    # Building and updates
+    # -------------------------
+    def _slot_span(self, start, end):
+        """First and one-past-last slot touched by ``[start, end)``, clipped."""
+        first = (start - self._t0) // self._width
+        last = -((self._t0 - end) // self._width)
+        return np.clip(first, 0, self.slots), np.clip(last, 0, self.slots)
+
+    def _load(self, rows, starts, ends):
+        # Mark each booking's first and one-past-last slot, then a running
+        # sum along the time axis fills in everything between.
+        first, last = self._slot_span(starts, ends)
+        keep = first < last
+        diff = np.zeros((len(self.room_ids), self.slots + 1), dtype=np.int32)
+        np.add.at(diff, (rows[keep], first[keep]), 1)
+        np.add.at(diff, (rows[keep], last[keep]), -1)
+        self.busy += np.cumsum(diff[:, :-1], axis=1, dtype=np.int32)
+
+    def _on_change(self, event: str, classroom_id: str, detail):
+        with self._lock:
+            if event == "classroom":
+                self._rows[classroom_id] = len(self.room_ids)
+                self.room_ids.append(classroom_id)
+                self.busy = np.vstack([self.busy, np.zeros((1, self.slots), dtype=np.int32)])
+                self.maintenance = np.append(self.maintenance, detail.is_under_maintenance)
+            elif event == "maintenance":
+                self.maintenance[self._rows[classroom_id]] = detail
+            elif event in ("booked", "released"):
+                row = self.busy[self._rows[classroom_id]]
+                for start, end in detail:
+                    first, last = self._slot_span(start, end)
+                    if event == "booked":
+                        row[first:last] += 1
+                    else:
+                        row[first:last] -= 1
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def _window(self, start: Optional[datetime], end: Optional[datetime],
+                inside: bool = False) -> Tuple[int, int]:
+        """Slots touched by ``[start, end)``; None means the matrix edge.
+        With ``inside`` the window must lie within the matrix."""
+        start_us = self._t0 if start is None else to_epoch(start, self.scheduler.tz)
+        end_us = self._t0 + self.slots * self._width if end is None else to_epoch(end, self.scheduler.tz)
+        if inside and (start_us < self._t0 or end_us > self._t0 + self.slots * self._width):
+            raise ValueError("The window isn't covered by the matrix.")
+        first, last = self._slot_span(start_us, end_us)
+        if first >= last:
+            raise ValueError("The window doesn't overlap the matrix.")
+        return int(first), int(last)
+
+    def slot_start(self, slot: int) -> datetime:
+        return from_epoch(self._t0 + slot * self._width, self.scheduler.tz)
+
+    def utilisation(self, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> Dict[str, float]:
+        """Fraction of occupied slots per room."""
+        first, last = self._window(start, end)
+        with self._lock:
+            used = (self.busy[:, first:last] > 0).mean(axis=1)
+        return dict(zip(self.room_ids, used.tolist()))
+
+    def hourly_profile(self, start: Optional[datetime] = None,
+                       end: Optional[datetime] = None) -> Dict[int, float]:
+        """Average fraction of rooms in use for each local hour of the day."""
+        first, last = self._window(start, end)
+        with self._lock:
+            in_use = (self.busy[:, first:last] > 0).mean(axis=0)
+        hours = self._slot_hours[first:last]
+        totals = np.bincount(hours, weights=in_use, minlength=24)
+        counts = np.bincount(hours, minlength=24)
+        return {hour: float(totals[hour] / counts[hour]) for hour in np.flatnonzero(counts).tolist()}
+
+    def peak_hours(self, top: int = 3, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Tuple[int, float]]:
+        profile = self.hourly_profile(start, end)
+        return sorted(profile.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    def busiest_slots(self, top: int = 10) -> List[Tuple[datetime, int]]:
+        """The ``top`` slots with the most rooms in use."""
+        with self._lock:
+            in_use = (self.busy > 0).sum(axis=0)
+        order = np.argsort(in_use, kind="stable")[::-1][:top]
+        return [(self.slot_start(int(i)), int(in_use[i])) for i in order]
+
+    def heatmap(self, start: Optional[datetime] = None,
+                end: Optional[datetime] = None):
+        """Rooms x 24 array of utilisation by local hour of the day."""
+        first, last = self._window(start, end)
+        with self._lock:
+            used = (self.busy[:, first:last] > 0).astype(np.float64)
+        hours = self._slot_hours[first:last]
+        counts = np.bincount(hours, minlength=24)
+        onehot = np.zeros((last - first, 24))
+        onehot[np.arange(last - first), hours] = 1.0
+        return (used @ onehot) / np.maximum(counts, 1)
+
+    def free_rooms(self, start: datetime, end: datetime,
+                   include_maintenance: bool = False) -> List[str]:
+        """Rooms with no booking in any slot touching ``[start, end)``."""
+        first, last = self._window(start, end, inside=True)
+        with self._lock:
+            free = ~self.busy[:, first:last].any(axis=1)
+            if not include_maintenance:
+                free &= ~self.maintenance
+        return [self.room_ids[i] for i in np.flatnonzero(free).tolist()]
@@ -0,0 +1,416 @@
+# scheduler_store.py
+# Persistence backends for Classroom_Manager.Scheduler.
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import List, Optional
+
+from Classroom_Manager import (Classroom, EquipmentBooking, MaintenanceTicket, Reservation,
+                               RecurringReservation)
+
+
+class SchedulerStore(ABC):
+    """Interface a Scheduler persistence backend has to implement."""
+
+    @abstractmethod
+    def load_classrooms(self) -> List[Classroom]:
+        ...
+
+    @abstractmethod
+    def save_classroom(self, room: Classroom):
+        ...
+
+    @abstractmethod
+    def load_tickets(self, classroom_id: Optional[str] = None, status: str = "all") -> List[MaintenanceTicket]:
+        ...
+
+    @abstractmethod
+    def save_tickets(self, tickets: List[MaintenanceTicket]):
+        """Insert new tickets and record resolutions, in one transaction."""
+
+    @abstractmethod
+    def next_ticket_id(self) -> int:
+        ...
+
+    @abstractmethod
+    def load_reservations(self, classroom_id: str, since: Optional[int] = None,
+                          until: Optional[int] = None) -> List[Reservation]:
+        ...
+
+    @abstractmethod
+    def get_reservation(self, reservation_id: int) -> Optional[Reservation]:
+        ...
+
+    @abstractmethod
+    def update_reservation(self, reservation: Reservation):
+        ...
+
+    @abstractmethod
+    def delete_reservation(self, reservation_id: int):
+        ...
+
+    @abstractmethod
+    def add_reservations(self, reservations: List[Reservation]):
+        ...
+
+    @abstractmethod
+    def find_overlap(self, classroom_id: str, start: int, end: int) -> Optional[Reservation]:
+        ...
+
+    @abstractmethod
+    def count_reservations(self) -> int:
+        ...
+
+    @abstractmethod
+    def load_recurring(self) -> List[RecurringReservation]:
+        ...
+
+    @abstractmethod
+    def save_recurring(self, series: RecurringReservation):
+        ...
+
+    @abstractmethod
+    def delete_recurring(self, series_id: int):
+        ...
+
+    @abstractmethod
+    def load_equipment_bookings(self, equipment_id: str, since: Optional[int] = None) -> List[EquipmentBooking]:
+        ...
+
+    @abstractmethod
+    def get_equipment_booking(self, booking_id: int) -> Optional[EquipmentBooking]:
+        ...
+
+    @abstractmethod
+    def linked_equipment(self, reservation_id: int) -> List[str]:
+        """Ids of the equipment booked together with a room reservation."""
+
+    @abstractmethod
+    def add_equipment_bookings(self, bookings: List[EquipmentBooking]):
+        ...
+
+    @abstractmethod
+    def update_equipment_bookings(self, bookings: List[EquipmentBooking]):
+        ...
+
+    @abstractmethod
+    def delete_equipment_bookings(self, booking_ids: List[int]):
+        ...
+
+    @abstractmethod
+    def next_reservation_id(self) -> int:
+        ...
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class SQLiteSchedulerStore(SchedulerStore):
+    """Scheduler state in a local SQLite database running in WAL mode.
+
+    Reservations added one at a time are buffered and written in a single
+    transaction once ``batch_size`` of them are pending, or on ``flush()``.
+    Every read flushes first, so queries always see buffered writes.
+    One connection is shared by all threads, serialised by an internal lock.
+
+    Reservation times are stored as epoch microseconds (UTC).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS classrooms (
+            id TEXT PRIMARY KEY,
+            capacity INTEGER NOT NULL,
+            location TEXT,
+            is_under_maintenance INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS maintenance_tickets (
+            id INTEGER PRIMARY KEY,
+            classroom_id TEXT NOT NULL REFERENCES classrooms(id),
+            description TEXT NOT NULL,
+            reported INTEGER NOT NULL,
+            start INTEGER,
+            "end" INTEGER,
+            resolved INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_tickets_room ON maintenance_tickets(classroom_id, resolved);
+        CREATE TABLE IF NOT EXISTS reservations (
+            id INTEGER PRIMARY KEY,
+            classroom_id TEXT NOT NULL REFERENCES classrooms(id),
+            reserved_by TEXT NOT NULL,
+            start INTEGER NOT NULL,
+            "end" INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_reservations_window
+            ON reservations(classroom_id, start, "end");
+        CREATE TABLE IF NOT EXISTS equipment_bookings (
+            id INTEGER PRIMARY KEY,
+            equipment_id TEXT NOT NULL,
+            reserved_by TEXT NOT NULL,
+            start INTEGER NOT NULL,
+            "end" INTEGER NOT NULL,
+            reservation_id INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_equipment_window
+            ON equipment_bookings(equipment_id, start, "end");
+        CREATE INDEX IF NOT EXISTS idx_equipment_reservation ON equipment_bookings(reservation_id);
+        CREATE TABLE IF NOT EXISTS recurring_reservations (
+            id INTEGER PRIMARY KEY,
+            classroom_id TEXT NOT NULL REFERENCES classrooms(id),
+            reserved_by TEXT NOT NULL,
+            start TEXT NOT NULL,
+            "end" TEXT NOT NULL,
+            frequency TEXT NOT NULL,
+            until TEXT NOT NULL,
+            exceptions TEXT NOT NULL DEFAULT ''
+        );
+    """
+
+    def __init__(self, path: str = "scheduler.db", batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: List[Reservation] = []
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    # Recurring bookings keep naive wall-clock times, stored as fixed-width
+    # ISO strings.
+    @staticmethod
+    def _ts(value: datetime) -> str:
+        return value.isoformat(sep=" ", timespec="microseconds")
+
+    @staticmethod
+    def _row_to_reservation(row) -> Reservation:
+        return Reservation(
+            id=row[0],
+            classroom_id=row[1],
+            reserved_by=row[2],
+            start_us=row[3],
+            end_us=row[4]
+        )
+
+    # -------------------------
+    # Classrooms
+    # -------------------------
+    def load_classrooms(self) -> List[Classroom]:
+        with self._lock:
+            return [
+                Classroom(id=row[0], capacity=row[1], location=row[2],
+                          is_under_maintenance=bool(row[3]))
+                for row in self._conn.execute(
+                    "SELECT id, capacity, location, is_under_maintenance FROM classrooms")
+            ]
+
+    def save_classroom(self, room: Classroom):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO classrooms (id, capacity, location, is_under_maintenance) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                "capacity = excluded.capacity, location = excluded.location, "
+                "is_under_maintenance = excluded.is_under_maintenance",
+                (room.id, room.capacity, room.location, int(room.is_under_maintenance)))
+
+    # -------------------------
+    # Maintenance tickets
+    # -------------------------
+    def load_tickets(self, classroom_id: Optional[str] = None, status: str = "all") -> List[MaintenanceTicket]:
+        query = ('SELECT id, classroom_id, description, reported, start, "end", resolved '
+                 "FROM maintenance_tickets WHERE 1 = 1")
+        params = []
+        if classroom_id is not None:
+            query += " AND classroom_id = ?"
+            params.append(classroom_id)
+        if status == "open":
+            query += " AND resolved IS NULL"
+        elif status == "resolved":
+            query += " AND resolved IS NOT NULL"
+        with self._lock:
+            return [MaintenanceTicket(*row) for row in self._conn.execute(query + " ORDER BY id", params)]
+
+    def save_tickets(self, tickets: List[MaintenanceTicket]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO maintenance_tickets "
+                '(id, classroom_id, description, reported, start, "end", resolved) '
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET resolved = excluded.resolved",
+                [(t.id, t.classroom_id, t.description, t.reported_us, t.start_us, t.end_us, t.resolved_us)
+                 for t in tickets])
+
+    def next_ticket_id(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM maintenance_tickets").fetchone()[0]
+
+    # -------------------------
+    # Reservations
+    # -------------------------
+    def load_reservations(self, classroom_id: str, since: Optional[int] = None,
+                          until: Optional[int] = None) -> List[Reservation]:
+        """A room's reservations by start time, skipping those ended by
+        ``since`` and those starting at or after ``until``."""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                'SELECT id, classroom_id, reserved_by, start, "end" FROM reservations '
+                'WHERE classroom_id = ? AND start < ? AND "end" > ? ORDER BY start',
+                (classroom_id, until if until is not None else 2 ** 63 - 1,
+                 since if since is not None else -2 ** 63))
+            return [self._row_to_reservation(row) for row in rows]
+
+    def get_reservation(self, reservation_id: int) -> Optional[Reservation]:
+        with self._lock:
+            self.flush()
+            row = self._conn.execute(
+                'SELECT id, classroom_id, reserved_by, start, "end" FROM reservations WHERE id = ?',
+                (reservation_id,)).fetchone()
+            return self._row_to_reservation(row) if row else None
+
+    def update_reservation(self, reservation: Reservation):
+        with self._lock:
+            self.flush()
+            with self._conn:
+                self._conn.execute(
+                    'UPDATE reservations SET start = ?, "end" = ? WHERE id = ?',
+                    (reservation.start_us, reservation.end_us, reservation.id))
+
+    def delete_reservation(self, reservation_id: int):
+        with self._lock:
+            self.flush()
+            with self._conn:
+                self._conn.execute("DELETE FROM reservations WHERE id = ?", (reservation_id,))
+
+    def add_reservations(self, reservations: List[Reservation]):
+        with self._lock:
+            self._pending.extend(reservations)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def find_overlap(self, classroom_id: str, start: int, end: int) -> Optional[Reservation]:
+        with self._lock:
+            # Same rule as the in-memory index: a room's bookings never overlap,
+            # so only the latest booking starting before ``end`` can collide.
+            self.flush()
+            row = self._conn.execute(
+                'SELECT id, classroom_id, reserved_by, start, "end" FROM reservations '
+                "WHERE classroom_id = ? AND start < ? ORDER BY start DESC LIMIT 1",
+                (classroom_id, end)).fetchone()
+            if row and row[4] > start:
+                return self._row_to_reservation(row)
+            return None
+
+    def count_reservations(self) -> int:
+        with self._lock:
+            self.flush()
+            return self._conn.execute("SELECT COUNT(*) FROM reservations").fetchone()[0]
+
+    def next_reservation_id(self) -> int:
+        # Single and recurring reservations and equipment bookings share one
+        # id sequence.
+        with self._lock:
+            self.flush()
+            return self._conn.execute(
+                "SELECT MAX(COALESCE((SELECT MAX(id) FROM reservations), 0), "
+                "COALESCE((SELECT MAX(id) FROM recurring_reservations), 0), "
+                "COALESCE((SELECT MAX(id) FROM equipment_bookings), 0)) + 1").fetchone()[0]
+
+    # -------------------------
+    # Equipment bookings
+    # -------------------------
+    def load_equipment_bookings(self, equipment_id: str, since: Optional[int] = None) -> List[EquipmentBooking]:
+        """An item's bookings by start time, skipping those ended by ``since``."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, equipment_id, reserved_by, start, "end", reservation_id FROM equipment_bookings '
+                'WHERE equipment_id = ? AND "end" > ? ORDER BY start',
+                (equipment_id, since if since is not None else -2 ** 63))
+            return [EquipmentBooking(*row) for row in rows]
+
+    def get_equipment_booking(self, booking_id: int) -> Optional[EquipmentBooking]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT id, equipment_id, reserved_by, start, "end", reservation_id FROM equipment_bookings '
+                "WHERE id = ?", (booking_id,)).fetchone()
+            return EquipmentBooking(*row) if row else None
+
+    def linked_equipment(self, reservation_id: int) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT equipment_id FROM equipment_bookings WHERE reservation_id = ?", (reservation_id,))]
+
+    def add_equipment_bookings(self, bookings: List[EquipmentBooking]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT INTO equipment_bookings (id, equipment_id, reserved_by, start, "end", reservation_id) '
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(b.id, b.equipment_id, b.reserved_by, b.start_us, b.end_us, b.reservation_id)
+                 for b in bookings])
+
+    def update_equipment_bookings(self, bookings: List[EquipmentBooking]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'UPDATE equipment_bookings SET start = ?, "end" = ? WHERE id = ?',
+                [(b.start_us, b.end_us, b.id) for b in bookings])
+
+    def delete_equipment_bookings(self, booking_ids: List[int]):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM equipment_bookings WHERE id = ?",
+                                   [(booking_id,) for booking_id in booking_ids])
+
+    # -------------------------
+    # Recurring reservations
+    # -------------------------
+    def load_recurring(self) -> List[RecurringReservation]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, classroom_id, reserved_by, start, "end", frequency, until, exceptions '
+                "FROM recurring_reservations ORDER BY id")
+            return [
+                RecurringReservation(
+                    id=row[0],
+                    classroom_id=row[1],
+                    reserved_by=row[2],
+                    start=datetime.fromisoformat(row[3]),
+                    end=datetime.fromisoformat(row[4]),
+                    frequency=row[5],
+                    until=date.fromisoformat(row[6]),
+                    exceptions={date.fromisoformat(day) for day in row[7].split(",") if day}
+                )
+                for row in rows
+            ]
+
+    def save_recurring(self, series: RecurringReservation):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO recurring_reservations "
+                '(id, classroom_id, reserved_by, start, "end", frequency, until, exceptions) '
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                "exceptions = excluded.exceptions",
+                (series.id, series.classroom_id, series.reserved_by, self._ts(series.start),
+                 self._ts(series.end), series.frequency, series.until.isoformat(),
+                 ",".join(sorted(day.isoformat() for day in series.exceptions))))
+
+    def delete_recurring(self, series_id: int):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM recurring_reservations WHERE id = ?", (series_id,))
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT INTO reservations (id, classroom_id, reserved_by, start, "end") '
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(r.id, r.classroom_id, r.reserved_by, r.start_us, r.end_us)
+                     for r in self._pending])
+            self._pending.clear()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()